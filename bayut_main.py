@@ -1,4 +1,3 @@
-from bs4 import BeautifulSoup
 import requests
 import os
 import pandas as pd
@@ -6,20 +5,71 @@ from datetime import datetime
 import time
 import logging
 import json
+import re
+from transport import build_session
+from http_cache import HttpCache
+from embedded_json import extract_bayut_listings, extract_json_ld, map_bayut_json_ld
+from dedup import card_end
+from parsing import DEFAULT_PARSER, parse_html, resolve_parser
+from normalize import normalize_listing_columns
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+BAYUT_CARD_PATTERN = re.compile(r'<li\b[^>]*\baria-label=["\']Listing["\'][^>]*>', re.I)
+
+
+def visible_card_fields(card):
+    """Price, Location and Reference as shown on a card, for older and current Bayut markup"""
+    price = card.find("span", class_="f343d9ce") or card.find("span", attrs={"aria-label": "Price"})
+    location = card.find("div", class_="_7e396fc3") or card.find(attrs={"aria-label": "Location"})
+    reference = next((span for span in card.find_all("span")
+                      if span.find() is None and "Ref" in span.get_text()), None)
+    return {
+        "Price": price.get_text(strip=True) if price else None,
+        "Location": location.get_text(strip=True) if location else None,
+        "Reference": reference.get_text(strip=True) if reference else None,
+    }
+
+
+def bayut_card_segments(html_text):
+    """Raw HTML of every listing card on a results page, without parsing the page"""
+    starts = list(BAYUT_CARD_PATTERN.finditer(html_text))
+    segments = []
+    for n, match in enumerate(starts):
+        limit = starts[n + 1].start() if n + 1 < len(starts) else len(html_text)
+        segments.append(html_text[match.start():card_end(html_text, match.end(), limit)])
+    return segments
+
+
+def extract_bayut_cards(html_text, parser=DEFAULT_PARSER):
+    """Listings from each card's JSON-LD, completed from the card's visible HTML
+
+    Only one card is parsed at a time. Visible values win, as in the DOM
+    path; JSON-LD fills what the card doesn't show. Returns None when no
+    card carries JSON-LD.
+    """
+    listings = []
+    for segment in bayut_card_segments(html_text):
+        items = [item for item in extract_json_ld(segment) if "/property/" in str(item.get("url", ""))]
+        if not items:
+            continue
+        data_dict = map_bayut_json_ld(items[0])
+        visible = visible_card_fields(parse_html(segment, parser))
+        data_dict.update({field: value for field, value in visible.items() if value is not None})
+        listings.append(data_dict)
+    # Pages without recognisable cards still yield their JSON-LD listings
+    return listings or extract_bayut_listings(html_text)
 
 
 class BayutPropertyScraper:
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
+    def __init__(self, transport=None, parser=DEFAULT_PARSER, json_first=True, cache=None):
+        # Listing detail pages (/property/...) share the on-disk HttpCache with PropertyScraper
+        self.session = build_session(transport, cache=cache, cache_filter=lambda url: "/property/" in url)
+        self.parser = resolve_parser(parser)
         self.properties_data = []
+        self.json_first = json_first
 
 
     def fetch_properties(self, page=1):
@@ -29,7 +79,17 @@ class BayutPropertyScraper:
         try:
             response = self.session.get(url)
             response.raise_for_status()
-            soup = BeautifulSoup(response.text, "html.parser")
+            
+            # Every card ships its data as JSON-LD; only the fields it lacks come from the card
+            if self.json_first:
+                embedded_listings = extract_bayut_cards(response.text, self.parser)
+                if embedded_listings:
+                    logger.info(f"Extracted {len(embedded_listings)} listings from embedded JSON-LD")
+                    self.properties_data.extend(embedded_listings)
+                    return embedded_listings
+            
+            soup = parse_html(response.text, self.parser)
+            page_listings = []
             bayut_lands = soup.find("ul", class_="e20beb46").find_all("li")
             
             for land in bayut_lands[:3]:
@@ -55,24 +115,13 @@ class BayutPropertyScraper:
                         pass
 
                 # --- 2. From visible HTML
-                try:
-                    data_dict["Price"] = land.find("span", class_="f343d9ce").get_text(strip=True)
-                except:
-                    data_dict["Price"] = None
-
-                try:
-                    data_dict["Location"] = land.find("div", class_="_7e396fc3").get_text(strip=True)
-                except:
-                    data_dict["Location"] = None
-
-                try:
-                    data_dict["Reference"] = land.find("span", string=lambda s: s and "Ref" in s).get_text(strip=True)
-                except:
-                    data_dict["Reference"] = None
+                data_dict.update(visible_card_fields(land))
+                
+                page_listings.append(data_dict)
                 
                 internal_link_response  = self.session.get(data_dict["URL"])
                 internal_link_response.raise_for_status()
-                internal_soup = BeautifulSoup(internal_link_response.text, "html.parser")
+                internal_soup = parse_html(internal_link_response.text, self.parser)
 
                 print(internal_soup)
 
@@ -80,13 +129,18 @@ class BayutPropertyScraper:
 
 
             
-            return soup
+            self.properties_data.extend(page_listings)
+            return page_listings
         except requests.RequestException as e:
             logger.error(f"Error fetching properties: {e}")
             return None
 
+    def to_frame(self):
+        """Collected listings with numeric price_aed, area_sqft (from Size + Unit) and room counts"""
+        return normalize_listing_columns(pd.DataFrame(self.properties_data))
+
 
 
 if __name__ == "__main__":
-    scraper = BayutPropertyScraper()
-    soup = scraper.fetch_properties()
\ No newline at end of file
+    scraper = BayutPropertyScraper(cache=HttpCache())
+    properties = scraper.fetch_properties()
\ No newline at end of file
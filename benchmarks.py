@@ -0,0 +1,164 @@
+import argparse
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from excel_export import write_workbook
+from normalize import normalize_listing_columns
+from extraction import CardExtractor
+from parsing import PARSER_BACKENDS, parse_html, resolve_parser
+
+SAMPLE_CARD = """
+<li data-id="{n}">
+  <article class="styles-module_property-card__wrapper">
+    <a data-testid="property-card-link" href="/en/plp/buy/land-for-sale-dubai-{n}.html">
+      <span class="styles-module_image-count__xyz">12</span>
+    </a>
+    <p class="styles-module_listing-level__abc">Featured</p>
+    <button data-testid="property-card-tag">New</button>
+    <p data-testid="property-card-type">Land</p>
+    <p data-testid="property-card-price">1,200,000 AED</p>
+    <h2 class="styles-module_content__title__def">Residential plot {n} in Dubai Hills</h2>
+    <p class="styles-module_content__location__ghi">Dubai Hills Estate, Dubai</p>
+    <div>
+      <p data-testid="property-card-spec-bedroom">3 Beds</p>
+      <p data-testid="property-card-spec-bathroom">2 Baths</p>
+      <p data-testid="property-card-spec-area">5,000 sqft</p>
+    </div>
+    <p class="styles-module_publish-info__jkl">Listed 3 days ago</p>
+    <a data-testid="property-card-contact-action-CALL" href="tel:+971400000{n}">Call</a>
+  </article>
+</li>
+"""
+
+
+def sample_results_page(cards=25):
+    """Build a results page shaped like a Property Finder search page"""
+    items = "".join(SAMPLE_CARD.format(n=n) for n in range(cards))
+    return f'<html><body><ul class="styles_desktop_containerV85pq">{items}</ul></body></html>'
+
+
+def legacy_extract_card(land):
+    """The per-field find() extraction that CardExtractor replaced, kept as the baseline"""
+    values = {}
+    for key, name, attrs in (
+        ("property_type", "p", {"data-testid": "property-card-type"}),
+        ("price", "p", {"data-testid": "property-card-price"}),
+        ("area", "p", {"data-testid": "property-card-spec-area"}),
+        ("is_new", "button", {"data-testid": "property-card-tag"}),
+    ):
+        element = land.find(name, attrs)
+        values[key] = element.text.strip() if element else "N/A"
+    for key, name, needle in (
+        ("location", "p", "location"),
+        ("listing_status", "p", "listing-level"),
+        ("listed_time", "p", "publish-info"),
+        ("listing_image_count", "span", "image-count"),
+    ):
+        element = land.find(name, class_=lambda x: x and needle in x)
+        values[key] = element.text.strip() if element else "N/A"
+    title = land.find("h2", class_=lambda x: x and "title" in x) or land.find("h2")
+    values["title"] = title.text.strip() if title else "N/A"
+    link = land.find("a", {"data-testid": "property-card-link"}) or land.find("a")
+    values["link"] = link.get("href") if link else "N/A"
+    call_link = land.find("a", {"data-testid": "property-card-contact-action-CALL"})
+    values["phone"] = call_link.get("href") if call_link else "N/A"
+    values["specs"] = [spec.text.strip() for spec in
+                       land.find_all("p", {"data-testid": lambda x: x and "property-card-spec" in x})]
+    return values
+
+
+def _cards_per_second(extract, cards, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for card in cards:
+            extract(card)
+    return len(cards) * repeat / (time.perf_counter() - started)
+
+
+def bench_cards(path=None, parser="html.parser", repeat=20):
+    """Compare legacy per-field find() calls with the single-pass CardExtractor"""
+    markup = open(path, encoding="utf-8").read() if path else sample_results_page()
+    soup = parse_html(markup, resolve_parser(parser))
+    cards = soup.find_all("li")
+    if not cards:
+        print("No <li> cards found in the page")
+        return
+    extractor = CardExtractor()
+    before = _cards_per_second(legacy_extract_card, cards, repeat)
+    after = _cards_per_second(extractor.extract, cards, repeat)
+    print(f"Card extraction on {len(cards)} cards ({parser}, {repeat} rounds)")
+    print(f"  legacy find() calls : {before:10.0f} cards/sec")
+    print(f"  CardExtractor       : {after:10.0f} cards/sec  ({after / before:.1f}x)")
+
+
+SAMPLE_WORKBOOK = "property_data_20250802_133834(1).xlsx"
+
+
+def legacy_write_excel(filename, df):
+    """The openpyxl writer with a per-cell width loop that write_workbook replaced"""
+    with pd.ExcelWriter(filename, engine='openpyxl') as writer:
+        df.to_excel(writer, sheet_name='Property_Data', index=False)
+        worksheet = writer.sheets['Property_Data']
+        for column in worksheet.columns:
+            max_length = max(len(str(cell.value)) for cell in column)
+            worksheet.column_dimensions[column[0].column_letter].width = min(max_length + 2, 50)
+
+
+def bench_excel(path=SAMPLE_WORKBOOK, rows=100000):
+    """Time the legacy openpyxl export against write_workbook on a frame scaled to ``rows``"""
+    sample = pd.read_excel(path, sheet_name='Property_Data')
+    df = pd.concat([sample] * (rows // len(sample) + 1), ignore_index=True).head(rows)
+    with tempfile.TemporaryDirectory() as directory:
+        started = time.perf_counter()
+        legacy_write_excel(os.path.join(directory, "legacy.xlsx"), df)
+        before = time.perf_counter() - started
+        started = time.perf_counter()
+        engine = write_workbook(os.path.join(directory, "fast.xlsx"), {'Property_Data': df},
+                                sized_sheets=['Property_Data'])
+        after = time.perf_counter() - started
+    print(f"Excel export of {len(df)} rows x {len(df.columns)} columns")
+    print(f"  openpyxl + cell loop : {before:8.1f} s")
+    print(f"  write_workbook       : {after:8.1f} s  ({engine}, {before / after:.1f}x)")
+
+
+def bench_normalize(path=SAMPLE_WORKBOOK, rows=1000000):
+    """Rows per second through normalize_listing_columns on a frame scaled to ``rows``"""
+    sample = pd.read_excel(path, sheet_name='Property_Data', dtype=str)
+    df = pd.concat([sample] * (rows // len(sample) + 1), ignore_index=True).head(rows)
+    started = time.perf_counter()
+    normalize_listing_columns(df)
+    elapsed = time.perf_counter() - started
+    print(f"Normalized {len(df)} rows in {elapsed:.2f} s ({len(df) / elapsed:,.0f} rows/sec)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scraper micro-benchmarks")
+    subcommands = parser.add_subparsers(dest="benchmark", required=True)
+
+    cards = subcommands.add_parser("cards", help="listing card extraction throughput")
+    cards.add_argument("page", nargs="?", help="saved results page (defaults to a synthetic 25-card page)")
+    cards.add_argument("--parser", default="html.parser", choices=PARSER_BACKENDS)
+    cards.add_argument("--repeat", type=int, default=20)
+
+    excel = subcommands.add_parser("excel", help="save_to_excel workbook export time")
+    excel.add_argument("workbook", nargs="?", default=SAMPLE_WORKBOOK, help="workbook with a Property_Data sheet")
+    excel.add_argument("--rows", type=int, default=100000)
+
+    normalize = subcommands.add_parser("normalize", help="price/area/rooms/listing date parsing throughput")
+    normalize.add_argument("workbook", nargs="?", default=SAMPLE_WORKBOOK, help="workbook with a Property_Data sheet")
+    normalize.add_argument("--rows", type=int, default=1000000)
+
+    args = parser.parse_args()
+    if args.benchmark == "cards":
+        bench_cards(args.page, args.parser, args.repeat)
+    elif args.benchmark == "excel":
+        bench_excel(args.workbook, args.rows)
+    elif args.benchmark == "normalize":
+        bench_normalize(args.workbook, args.rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+import json
+import logging
+import os
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHECKPOINT_PATH = "scrape_checkpoint.json"
+
+
+class ScrapeCheckpoint:
+    """Durable progress record for a multi-page scrape
+
+    The small JSON file holds the run configuration, the last page that was
+    fully merged and the records still waiting on detail enrichment. Seen
+    property_ids are appended to a sidecar ``.ids`` file so saving after
+    every page stays cheap on very long runs.
+    """
+    def __init__(self, path=DEFAULT_CHECKPOINT_PATH):
+        self.path = path
+        self.ids_path = f"{path}.ids"
+        self.config = {}
+        self.last_completed_page = None
+        self.consecutive_empty_pages = 0
+        self.record_count = 0
+        self.pending_details = []
+        self.seen_ids = set()
+        self.finished = False
+        self.updated_at = None
+
+    @classmethod
+    def load(cls, path=DEFAULT_CHECKPOINT_PATH):
+        """Read a checkpoint back from disk; returns None if there is none"""
+        if not os.path.exists(path):
+            return None
+        checkpoint = cls(path)
+        with open(path, encoding="utf-8") as f:
+            state = json.load(f)
+        checkpoint.config = state.get("config", {})
+        checkpoint.last_completed_page = state.get("last_completed_page")
+        checkpoint.consecutive_empty_pages = state.get("consecutive_empty_pages", 0)
+        checkpoint.record_count = state.get("record_count", 0)
+        checkpoint.pending_details = state.get("pending_details", [])
+        checkpoint.finished = state.get("finished", False)
+        checkpoint.updated_at = state.get("updated_at")
+        if os.path.exists(checkpoint.ids_path):
+            with open(checkpoint.ids_path, encoding="utf-8") as f:
+                checkpoint.seen_ids = {line.rstrip("\n") for line in f if line.strip()}
+        return checkpoint
+
+    def start(self, **config):
+        """Begin a fresh run, discarding any previous progress at this path"""
+        self.config = config
+        self.last_completed_page = None
+        self.consecutive_empty_pages = 0
+        self.record_count = 0
+        self.pending_details = []
+        self.seen_ids = set()
+        self.finished = False
+        open(self.ids_path, "w").close()
+        self.save()
+
+    def page_completed(self, page_number, page_properties, consecutive_empty_pages, record_count, pending_details):
+        """Record that ``page_number`` has been merged and its records handed to the sink"""
+        new_ids = [str(p["property_id"]) for p in page_properties if str(p["property_id"]) not in self.seen_ids]
+        if new_ids:
+            with open(self.ids_path, "a", encoding="utf-8") as f:
+                f.write("\n".join(new_ids) + "\n")
+            self.seen_ids.update(new_ids)
+        self.last_completed_page = page_number
+        self.consecutive_empty_pages = consecutive_empty_pages
+        self.record_count = record_count
+        self.pending_details = pending_details
+        self.save()
+
+    def pending_saved(self, pending_details):
+        """Record the detail pages still outstanding after the pipeline was drained"""
+        self.pending_details = list(pending_details)
+        self.save()
+
+    def mark_finished(self, pending_details=()):
+        self.finished = True
+        self.pending_details = list(pending_details)
+        self.save()
+
+    def save(self):
+        """Write the checkpoint atomically so a crash never leaves a torn file"""
+        self.updated_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        state = {
+            "config": self.config,
+            "last_completed_page": self.last_completed_page,
+            "consecutive_empty_pages": self.consecutive_empty_pages,
+            "record_count": self.record_count,
+            "pending_details": self.pending_details,
+            "finished": self.finished,
+            "updated_at": self.updated_at,
+        }
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False, default=str)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
@@ -1,14 +1,21 @@
 import streamlit as st
 import pandas as pd
+import io
 import os
-import subprocess
-import sys
-import time
-import threading
-import queue
 from datetime import datetime
 import plotly.express as px
 import plotly.graph_objects as go
+from progress import ProgressTail
+
+CONSOLE_LINES = 50
+JOBS_SHOWN = 10
+PAGE_SIZES = [50, 100, 500]
+DATA_FILE_EXTENSIONS = (".xlsx", ".parquet", ".jsonl")
+DOWNLOAD_TYPES = {
+    ".xlsx": ("📥 Download Excel File", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    ".parquet": ("📥 Download Parquet File", "application/vnd.apache.parquet"),
+    ".jsonl": ("📥 Download JSONL Records", "application/jsonl"),
+}
 
 # Configure page
 st.set_page_config(
@@ -135,16 +142,12 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Initialize session state
-if 'scraper_running' not in st.session_state:
-    st.session_state.scraper_running = False
-if 'scraper_output' not in st.session_state:
-    st.session_state.scraper_output = ""
 if 'selected_option' not in st.session_state:
     st.session_state.selected_option = None
-if 'scraper_process' not in st.session_state:
-    st.session_state.scraper_process = None
-if 'output_queue' not in st.session_state:
-    st.session_state.output_queue = queue.Queue()
+if 'job_tails' not in st.session_state:
+    st.session_state.job_tails = {}  # job id -> (progress tail, log tail)
+if 'active_job_ids' not in st.session_state:
+    st.session_state.active_job_ids = set()
 
 # Check if main.py exists
 MAIN_PY_EXISTS = os.path.exists("main.py")
@@ -152,128 +155,138 @@ if not MAIN_PY_EXISTS:
     st.error("❌ main.py file not found! Please ensure your scraper file is named 'main.py' and in the same directory.")
     st.stop()
 
-def run_scraper_with_option(option):
-    """Run the main.py scraper with the selected option"""
-    try:
-        # Set environment variables for proper Unicode support
-        env = os.environ.copy()
-        env['PYTHONIOENCODING'] = 'utf-8'
-        env['PYTHONLEGACYWINDOWSSTDIO'] = '0'
-        
-        # Create input string with all expected inputs for the selected option
-        input_sequence = f"{option}\n"
-        
-        # Add confirmations and inputs based on option
-        if option == "4":
-            input_sequence += "y\n"  # Confirm large scrape
-        elif option == "5":
-            input_sequence += "y\n"  # Confirm very slow scrape
-            input_sequence += "y\n"  # Confirm large scrape
-        elif option == "6":
-            # Custom configuration - use values from session state
-            if 'custom_config' in st.session_state:
-                config = st.session_state.custom_config
-                input_sequence += f"{config['start_page']}\n"  # Starting page
-                
-                # Max pages input
-                if config['max_pages'] == 0:
-                    input_sequence += "\n"  # Empty for unlimited
-                else:
-                    input_sequence += f"{config['max_pages']}\n"
-                
-                # Detailed data
-                input_sequence += "y\n" if config['detailed_data'] else "n\n"
-                
-                # Auto detect
-                input_sequence += "y\n" if config['auto_detect'] else "n\n"
-                
-                # If detailed data and unlimited, add confirmations
-                if config['detailed_data'] and config['max_pages'] == 0:
-                    input_sequence += "y\n"  # Confirm extremely slow
-            else:
-                # Fallback defaults if no custom config
-                input_sequence += "1\n"    # Start page 1
-                input_sequence += "5\n"    # 5 pages
-                input_sequence += "n\n"    # No detailed data
-                input_sequence += "y\n"    # Auto detect
-        
-        # Create a subprocess to run main.py
-        process = subprocess.Popen(
-            [sys.executable, "main.py"],
-            stdin=subprocess.PIPE,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            text=True,
-            bufsize=0,
-            universal_newlines=True,
-            encoding='utf-8',
-            errors='replace',
-            env=env
-        )
-        
-        # Send all inputs at once
-        process.stdin.write(input_sequence)
-        process.stdin.close()  # Signal no more input
-        
-        return process
-        
-    except Exception as e:
-        st.error(f"Error starting scraper: {e}")
-        return None
+from main import job_config
+from job_manager import JobManager
+from shard_crawl import plan_page_shards
+from summary import UNKNOWN, SummaryStore, counts_by, filter_cube, price_histogram
 
-def read_process_output(process, output_queue):
-    """Read output from the scraper process and put it in queue"""
-    output_lines = []
-    try:
-        while True:
-            try:
-                output = process.stdout.readline()
-                if output == '' and process.poll() is not None:
-                    break
-                if output:
-                    # Clean the output to handle any encoding issues
-                    cleaned_output = output.strip()
-                    # Replace problematic Unicode characters if any remain
-                    cleaned_output = cleaned_output.encode('utf-8', 'replace').decode('utf-8')
-                    output_lines.append(cleaned_output)
-                    # Put output in queue instead of directly updating session state
-                    output_queue.put("\n".join(output_lines[-50:]))  # Keep last 50 lines
-            except UnicodeDecodeError as e:
-                # Handle any remaining Unicode issues gracefully
-                error_msg = f"[Encoding issue in output: {str(e)}]"
-                output_lines.append(error_msg)
-                output_queue.put("\n".join(output_lines[-50:]))
-        
-        # Get final return code
-        rc = process.poll()
-        if rc == 0:
-            output_lines.append("🎉 Scraping completed successfully!")
-        else:
-            output_lines.append(f"❌ Scraping ended with error code: {rc}")
-            if rc == 1:
-                output_lines.append("💡 This might be due to Unicode encoding issues.")
-                output_lines.append("💡 Try running the scraper directly in terminal to see full error details.")
-            
-        output_queue.put("\n".join(output_lines[-50:]))
-        output_queue.put("PROCESS_COMPLETE")  # Signal completion
-        
-    except Exception as e:
-        output_lines.append(f"Error reading output: {e}")
-        output_queue.put("\n".join(output_lines[-50:]))
-        output_queue.put("PROCESS_COMPLETE")
+@st.cache_resource(max_entries=4, show_spinner=False)
+def read_data_file(path, mtime_ns, size):
+    """Parse a scraper output file once per (path, mtime, size); the oldest entries are evicted first"""
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path)
+    if path.endswith(".jsonl"):
+        # A running scrape may be mid-line; read complete records only
+        with open(path, "rb") as f:
+            data = f.read()
+        data = data[:data.rfind(b"\n") + 1]
+        if not data:
+            return pd.DataFrame()
+        return pd.read_json(io.BytesIO(data), lines=True, dtype=False, convert_dates=False)
+    return pd.read_excel(path)
 
-def update_output_from_queue():
-    """Update session state from queue (called from main thread)"""
-    try:
-        while not st.session_state.output_queue.empty():
-            message = st.session_state.output_queue.get_nowait()
-            if message == "PROCESS_COMPLETE":
-                st.session_state.scraper_running = False
-                break
-            else:
-                st.session_state.scraper_output = message
-    except queue.Empty:
-        pass
+def load_data_file(path):
+    """Read a scraper output file; Parquet files carry typed columns and load much faster
+
+    Every panel gets the same cached frame until the file changes on disk,
+    so the 1-second reruns during a scrape never re-parse it. Treat the
+    result as read-only.
+    """
+    stat = os.stat(path)
+    return read_data_file(path, stat.st_mtime_ns, stat.st_size)
+
+@st.cache_resource
+def summary_store():
+    """Per-file aggregates shared by every session; see summary.SummaryStore"""
+    return SummaryStore()
+
+def file_summary(path):
+    """Counts per (location, property_type, price band) for a data file, without loading it on every rerun"""
+    return summary_store().summary(path, load_data_file)
+
+def filter_values(cube, column):
+    return sorted(value for value in cube[column].unique() if value != UNKNOWN)
+
+@st.cache_resource
+def job_manager():
+    """One server-side job manager shared by every session; job state lives in .jobs/ and survives reloads"""
+    return JobManager()
+
+def job_for_option(option):
+    """Job spec for a menu option (see main.JOB_PRESETS); option 6 uses the custom settings"""
+    if option != "6":
+        return job_config(preset=option)
+    config = st.session_state.get('custom_config', {'start_page': 1, 'max_pages': 5,
+                                                     'detailed_data': False, 'auto_detect': True})
+    return job_config({
+        "start_page": config['start_page'],
+        "max_pages": config['max_pages'] or None,
+        "detailed": config['detailed_data'],
+        "auto_detect_end": config['auto_detect'],
+    })
+
+def job_tails(job):
+    """Progress and log tails for a job, kept per session so each poll only reads new lines"""
+    tails = st.session_state.job_tails.get(job["id"])
+    if tails is None:
+        tails = (ProgressTail(job["progress_file"]),
+                 ProgressTail(job["log_file"], maxlen=CONSOLE_LINES, parse=None))
+        st.session_state.job_tails[job["id"]] = tails
+    for tail in tails:
+        tail.poll()
+    return tails
+
+def job_outcome(job):
+    result = job.get("result") or {}
+    if job["status"] == "done":
+        if result.get("listings"):
+            return f"🎉 Scraping completed successfully! {result['listings']} properties saved to {result['excel_file']}"
+        if result.get("unchanged"):
+            return f"✅ Nothing changed: all {result['unchanged']} listings seen match the last run"
+        return "❌ No properties were scraped"
+    if job["status"] == "stopped":
+        if not result.get("listings"):
+            return "⏹️ Stopped before any properties were scraped"
+        return f"⏹️ Stopped: {result['listings']} properties saved to {result['excel_file']}"
+    if job["status"] == "failed":
+        return f"❌ Scraping ended with an error: {job.get('error')}"
+    if job["status"] == "interrupted":
+        return f"⚠️ Interrupted by a dashboard restart; records so far are in {job['config']['records_file']}"
+    return None
+
+def show_progress_metrics(event):
+    if not event:
+        st.caption("Waiting for the first page...")
+        return
+    metric_cols = st.columns(4)
+    metric_cols[0].metric("Pages Done", event.get("pages_done", 0))
+    metric_cols[1].metric("Listings", event.get("listings", 0))
+    metric_cols[2].metric("Errors", event.get("errors", 0))
+    metric_cols[3].metric("Requests/s", f"{event.get('rate', 0):.2f}")
+
+STATUS_ICONS = {"queued": "⏳", "running": "🔄", "stopping": "⏹️", "done": "✅", "stopped": "⏹️",
+                "failed": "❌", "cancelled": "🚫", "interrupted": "⚠️"}
+
+@st.fragment(run_every=2)
+def live_jobs():
+    """Only this region refreshes while jobs run; the rest of the page stays put"""
+    manager = job_manager()
+    jobs = manager.jobs()[:JOBS_SHOWN]
+    active_ids = {job["id"] for job in jobs if job["status"] in ("queued", "running", "stopping")}
+    if not jobs:
+        st.info("No scrape jobs yet. Start one above.")
+    for job in jobs:
+        is_active = job["id"] in active_ids
+        label = f"{STATUS_ICONS.get(job['status'], '')} {job['name']} - {job['status']} ({job['submitted_at']})"
+        with st.expander(label, expanded=is_active):
+            progress_tail, log_tail = job_tails(job)
+            show_progress_metrics(progress_tail.latest)
+            lines = list(log_tail.events)
+            outcome = job_outcome(job)
+            if outcome:
+                lines.append(outcome)
+            console = "\n".join(lines)
+            st.markdown(f'<div class="console-output">{console}</div>', unsafe_allow_html=True)
+            if is_active and job["status"] != "stopping":
+                if st.button("⏹️ Stop Job", key=f"stop_{job['id']}"):
+                    # The job finishes the page in hand and saves what it has
+                    manager.stop(job["id"])
+                    st.warning("⏹️ Stopping job, saving the data collected so far...")
+    # When a job finishes, rerun the whole page so the status and file lists pick up its output
+    finished = st.session_state.active_job_ids - active_ids
+    st.session_state.active_job_ids = active_ids
+    if finished:
+        st.rerun()
 
 # Sidebar Configuration
 with st.sidebar:
@@ -281,7 +294,7 @@ with st.sidebar:
     st.write("**Using your existing main.py scraper**")
     
     # Main function options exactly as in your original main()
-    st.subheader("Select Option (1-6)")
+    st.subheader("Select Option (1-7)")
     
     options = {
         "1": "🚀 Quick scrape (3 pages, no detailed data)",
@@ -289,7 +302,8 @@ with st.sidebar:
         "3": "📈 Comprehensive scrape (10 pages, no detailed data)",
         "4": "♾️ UNLIMITED scrape (all pages, no detailed data)",
         "5": "⚠️ UNLIMITED with detailed data (WARNING: VERY SLOW)",
-        "6": "🔧 Custom configuration"
+        "6": "🔧 Custom configuration",
+        "7": "⏩ Incremental refresh (stop at already-stored listings)"
     }
     
     selected_option = st.radio("Choose scraping option:", list(options.keys()), 
@@ -315,6 +329,9 @@ with st.sidebar:
         st.error("✅ UNLIMITED with detailed data")
         st.error("⚠️ WARNING: This will be VERY SLOW but collect maximum data")
         st.error("⏰ This could take hours to complete")
+    elif selected_option == "7":
+        st.info("✅ Incremental refresh: newest pages only")
+        st.write("Stops once consecutive pages hold only listings already in listings.db")
     elif selected_option == "6":
         st.info("✅ Custom configuration")
         st.write("Configure your custom scraping parameters below:")
@@ -354,8 +371,8 @@ with st.sidebar:
     # Troubleshooting section
     with st.expander("🔧 Troubleshooting"):
         st.write("**Common Issues:**")
-        st.write("• **Unicode Error**: If you see encoding errors, try running the scraper directly in terminal first")
-        st.write("• **Option 4/5 Issues**: These options may require manual confirmation - check console output")
+        st.write("• **Scraper Errors**: Run the same job in a terminal to see full error details")
+        st.write("• **Queued Jobs**: At most two scrapes run at once; a new one waits for a free worker")
         st.write("• **Process Timeout**: Large scrapes may appear to hang - this is normal for unlimited options")
         
         st.write("**Tips:**")
@@ -364,7 +381,8 @@ with st.sidebar:
         st.write("• Option 5 should only be used when you need detailed property data")
         
         if st.button("🧪 Test main.py directly", key="test_main"):
-            st.code("python main.py", language="bash")
+            st.code(f"python main.py --preset {selected_option}" if selected_option != "6" else "python main.py",
+                    language="bash")
             st.info("Run this command in your terminal to test the scraper directly")
     
     st.divider()
@@ -373,28 +391,24 @@ with st.sidebar:
     st.header("🔍 Data Filters")
     
     # Get available files for filtering
-    excel_files = [f for f in os.listdir(".") if f.endswith(".xlsx") and "property_data" in f]
+    excel_files = [f for f in os.listdir(".") if f.endswith(DATA_FILE_EXTENSIONS) and "property_data" in f]
+    summary_store().prune(excel_files)
     
     if excel_files:
         try:
             latest_file = max(excel_files, key=lambda x: os.path.getctime(x))
-            df_for_filters = pd.read_excel(latest_file)
+            # Filter choices come from the precomputed summary, not from the file itself
+            cube_for_filters = file_summary(latest_file)
             
             # Location filter
-            if "location" in df_for_filters.columns:
-                location_filter = st.multiselect("Location", 
-                                        df_for_filters["location"].dropna().unique(),
-                                        key="location_filter")
-            else:
-                location_filter = []
+            location_filter = st.multiselect("Location", 
+                                    filter_values(cube_for_filters, "location"),
+                                    key="location_filter")
             
             # Property type filter
-            if "property_type" in df_for_filters.columns:
-                prop_type_filter = st.multiselect("Property Type", 
-                                         df_for_filters["property_type"].dropna().unique(),
-                                         key="property_type_filter")
-            else:
-                prop_type_filter = []
+            prop_type_filter = st.multiselect("Property Type", 
+                                     filter_values(cube_for_filters, "property_type"),
+                                     key="property_type_filter")
                 
         except Exception as e:
             st.error(f"Error loading filter data: {e}")
@@ -415,60 +429,35 @@ with col1:
     button_col1, button_col2 = st.columns(2)
     
     with button_col1:
-        if st.button("▶️ Start Scraping", type="primary", width="stretch", 
-                    disabled=st.session_state.scraper_running):
-            if not st.session_state.scraper_running:
-                st.session_state.scraper_running = True
-                st.session_state.scraper_output = f"🚀 Starting scraper with option {st.session_state.selected_option}...\n"
-                
-                # Add custom config info to output if option 6
-                if st.session_state.selected_option == "6" and 'custom_config' in st.session_state:
-                    config = st.session_state.custom_config
-                    config_info = f"""
-Custom Configuration:
-- Starting page: {config['start_page']}
-- Pages to scrape: {'Unlimited' if config['max_pages'] == 0 else config['max_pages']}
-- Detailed data: {'Yes' if config['detailed_data'] else 'No'}
-- Auto-detect end: {'Yes' if config['auto_detect'] else 'No'}
-
-"""
-                    st.session_state.scraper_output += config_info
-                
-                # Start the scraper process
-                process = run_scraper_with_option(st.session_state.selected_option)
-                if process:
-                    st.session_state.scraper_process = process
-                    
-                    # Start reading output in a separate thread with queue
-                    threading.Thread(
-                        target=read_process_output, 
-                        args=(process, st.session_state.output_queue), 
-                        daemon=True
-                    ).start()
-                    
-                    st.success(f"✅ Scraper started with option {st.session_state.selected_option}")
-                    st.rerun()
-                else:
-                    st.session_state.scraper_running = False
+        base_url_input = st.text_input("Search URL", value=job_config()["base_url"], key="job_base_url")
     
     with button_col2:
-        if st.button("⏹️ Stop Scraper", width="stretch",
-                    disabled=not st.session_state.scraper_running):
-            if st.session_state.scraper_running and st.session_state.scraper_process:
-                try:
-                    st.session_state.scraper_process.terminate()
-                    st.session_state.scraper_running = False
-                    st.session_state.scraper_output += "\n⏹️ Scraper stopped by user"
-                    st.warning("⏹️ Scraper stopped")
-                except Exception as e:
-                    st.error(f"Error stopping scraper: {e}")
+        shard_count = st.number_input("Split into page shards (bounded scrapes)", min_value=1, max_value=8,
+                                      value=1, key="job_shards")
+    
+    if st.button("▶️ Start Scraping", type="primary", width="stretch"):
+        # Jobs run server-side; several can run at once and survive a page reload
+        try:
+            job = job_for_option(st.session_state.selected_option)
+            job["base_url"] = base_url_input
+            name = options[st.session_state.selected_option]
+            if shard_count > 1 and job["max_pages"]:
+                shards = plan_page_shards(job["base_url"], job["start_page"], job["max_pages"], shard_count)
+                job_ids = job_manager().submit_shards(job, shards, name=name)
+                st.success(f"✅ Started {len(job_ids)} shard jobs with option {st.session_state.selected_option}")
+            else:
+                job_manager().submit(job, name=name)
+                st.success(f"✅ Scraper started with option {st.session_state.selected_option}")
+        except Exception as e:
+            st.error(f"Error starting scraper: {e}")
 
 with col2:
     st.subheader("📊 Status")
     
     # Status indicator
-    if st.session_state.scraper_running:
-        st.markdown('<div class="status-running">🔄 Scraper Running</div>', unsafe_allow_html=True)
+    running_jobs = job_manager().active_jobs()
+    if running_jobs:
+        st.markdown(f'<div class="status-running">🔄 {len(running_jobs)} Job(s) Running</div>', unsafe_allow_html=True)
     else:
         st.markdown('<div class="status-stopped">⏸️ Scraper Idle</div>', unsafe_allow_html=True)
     
@@ -476,35 +465,25 @@ with col2:
     if excel_files:
         try:
             latest_file = max(excel_files, key=lambda x: os.path.getctime(x))
-            df_stats = pd.read_excel(latest_file)
+            cube_stats = file_summary(latest_file)
+            total_count = int(cube_stats["count"].sum())
             
-            st.metric("Latest File", latest_file.replace("property_data_", "").replace(".xlsx", ""))
-            st.metric("Total Properties", len(df_stats))
+            st.metric("Latest File", os.path.splitext(latest_file.replace("property_data_", ""))[0])
+            st.metric("Total Properties", total_count)
             
-            if 'property_type' in df_stats.columns:
-                land_count = len(df_stats[df_stats['property_type'] == 'Land'])
-                if land_count == len(df_stats):
+            if total_count:
+                land_count = int(cube_stats.loc[cube_stats["property_type"] == "Land", "count"].sum())
+                if land_count == total_count:
                     st.success(f"✅ All {land_count} are LAND properties")
                 else:
-                    st.warning(f"⚠️ {land_count}/{len(df_stats)} are LAND properties")
+                    st.warning(f"⚠️ {land_count}/{total_count} are LAND properties")
                     
         except Exception as e:
             st.error(f"Error reading stats: {e}")
 
-# Console Output Section
-if st.session_state.scraper_output or st.session_state.scraper_running:
-    st.subheader("📺 Console Output")
-    
-    # Update output from queue if scraper is running
-    if st.session_state.scraper_running:
-        update_output_from_queue()
-        # Auto-refresh console while running
-        time.sleep(1)  # Small delay to prevent excessive refreshes
-        st.rerun()
-    
-    # Display console output
-    st.markdown(f'<div class="console-output">{st.session_state.scraper_output}</div>', 
-                unsafe_allow_html=True)
+# Jobs Section
+st.subheader("📺 Scrape Jobs")
+live_jobs()
 
 # File Management Section
 st.subheader("📁 Data Files Management")
@@ -579,7 +558,7 @@ if excel_files:
     col_file1, col_file2, col_file3 = st.columns([2, 1, 1])
     
     with col_file1:
-        selected_file = st.selectbox("📂 Select Excel File to View", excel_files, key="file_selector")
+        selected_file = st.selectbox("📂 Select Data File to View", excel_files, key="file_selector")
     
     with col_file2:
         if st.button("🔄 Refresh Files", width="stretch"):
@@ -596,13 +575,14 @@ if excel_files:
     
     if selected_file:
         try:
-            # Load and display data
-            df = pd.read_excel(selected_file)
+            # Load and display data; counts and charts come from the file's summary
+            df = load_data_file(selected_file)
+            cube = file_summary(selected_file)
             
             # File info
             file_stats = {
                 "File Size": f"{os.path.getsize(selected_file) / 1024:.1f} KB",
-                "Total Properties": len(df),
+                "Total Properties": int(cube["count"].sum()),
                 "Columns": len(df.columns),
                 "Date Created": datetime.fromtimestamp(os.path.getctime(selected_file)).strftime('%Y-%m-%d %H:%M')
             }
@@ -614,51 +594,69 @@ if excel_files:
                     st.metric(key, value)
             
             # Apply filters
-            filtered_df = df.copy()
-            if location_filter:
+            filtered_cube = filter_cube(cube, location_filter, prop_type_filter)
+            filtered_count = int(filtered_cube["count"].sum())
+            filtered_df = df  # Filtering returns new frames, the cached one is never modified
+            if location_filter and "location" in df.columns:
                 filtered_df = filtered_df[filtered_df["location"].isin(location_filter)]
-            if prop_type_filter:
+            if prop_type_filter and "property_type" in df.columns:
                 filtered_df = filtered_df[filtered_df["property_type"].isin(prop_type_filter)]
             
-            # Data preview
+            # Data preview, paged on the server so only one page reaches the browser
             st.subheader("🔍 Data Preview")
             
             if len(location_filter) > 0 or len(prop_type_filter) > 0:
                 st.info(f"Showing {len(filtered_df)} of {len(df)} properties (filtered)")
             
-            st.dataframe(filtered_df, width="stretch", height=400)
+            page_col1, page_col2 = st.columns([1, 3])
+            with page_col1:
+                page_size = st.selectbox("Rows per page", PAGE_SIZES, key="preview_page_size")
+            page_count = max(1, -(-len(filtered_df) // page_size))
+            with page_col2:
+                page = st.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count,
+                                       value=1, key="preview_page")
+            first_row = (min(page, page_count) - 1) * page_size
+            st.dataframe(filtered_df.iloc[first_row:first_row + page_size], width="stretch", height=400)
+            st.caption(f"Rows {first_row + 1 if len(filtered_df) else 0}-"
+                       f"{min(first_row + page_size, len(filtered_df))} of {len(filtered_df)}")
             
             # Visualizations
-            if len(filtered_df) > 0:
+            if filtered_count > 0:
                 st.subheader("📊 Data Visualizations")
                 
                 viz_col1, viz_col2 = st.columns(2)
                 
                 with viz_col1:
-                    if 'property_type' in filtered_df.columns:
-                        property_counts = filtered_df['property_type'].value_counts()
-                        fig_pie = px.pie(values=property_counts.values, 
-                                        names=property_counts.index,
-                                        title="Properties by Type")
-                        st.plotly_chart(fig_pie, width="stretch")
+                    property_counts = counts_by(filtered_cube, "property_type")
+                    fig_pie = px.pie(values=property_counts.values, 
+                                    names=property_counts.index,
+                                    title="Properties by Type")
+                    st.plotly_chart(fig_pie, width="stretch")
                 
                 with viz_col2:
-                    if 'location' in filtered_df.columns:
-                        location_counts = filtered_df['location'].value_counts().head(10)
-                        fig_bar = px.bar(x=location_counts.values,
-                                        y=location_counts.index,
-                                        orientation='h',
-                                        title="Top 10 Locations")
-                        fig_bar.update_layout(yaxis={'categoryorder': 'total ascending'})
-                        st.plotly_chart(fig_bar, width="stretch")
+                    location_counts = counts_by(filtered_cube, "location", limit=10)
+                    fig_bar = px.bar(x=location_counts.values,
+                                    y=location_counts.index,
+                                    orientation='h',
+                                    title="Top 10 Locations")
+                    fig_bar.update_layout(yaxis={'categoryorder': 'total ascending'})
+                    st.plotly_chart(fig_bar, width="stretch")
+                
+                price_counts = price_histogram(filtered_cube)
+                if price_counts.sum():
+                    fig_prices = px.bar(x=price_counts.index, y=price_counts.values,
+                                        labels={"x": "Price (AED)", "y": "Properties"},
+                                        title="Price Distribution")
+                    st.plotly_chart(fig_prices, width="stretch")
             
             # Download button
             with open(selected_file, 'rb') as file:
+                label, mime = DOWNLOAD_TYPES[os.path.splitext(selected_file)[1]]
                 st.download_button(
-                    label="📥 Download Excel File",
+                    label=label,
                     data=file,
                     file_name=selected_file,
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                    mime=mime,
                     width="stretch"
                 )
                 
@@ -0,0 +1,214 @@
+import hashlib
+import logging
+import math
+import os
+import re
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: saves still merge, but without a lock between processes
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CARD_INDEX_PATH = "card_hashes.tsv"
+CARD_HASH_FIELD = "_card_hash"  # Carried on a record until it is written, then dropped
+CARD_START_PATTERN = re.compile(r'<li\b[^>]*\bdata-id=["\']([^"\']+)["\'][^>]*>', re.I)
+LIST_TAG_PATTERN = re.compile(r'<(/?)(li|ul|ol)\b[^>]*>', re.I)
+
+
+def digest(data):
+    """64-bit blake2b digest as a hex string"""
+    if isinstance(data, str):
+        data = data.encode("utf-8", "replace")
+    return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+
+def fields_digest(fields):
+    """Digest of a card's extracted fields, independent of key order"""
+    return digest("\x1f".join(f"{key}\x1e{fields[key]}" for key in sorted(fields) if key != CARD_HASH_FIELD))
+
+
+def card_segments(html_text):
+    """Split a results page into ``(property_id, raw_card_html)`` pairs without parsing it
+
+    A card runs from its ``<li data-id=...>`` to its matching ``</li>``, so
+    lists nested inside a card stay with it; an unclosed card ends at the
+    next card or where its list closes. Returns an empty list when the page
+    has no such cards, so callers can fall back to a full parse.
+    """
+    starts = list(CARD_START_PATTERN.finditer(html_text))
+    segments = []
+    for n, match in enumerate(starts):
+        limit = starts[n + 1].start() if n + 1 < len(starts) else len(html_text)
+        segments.append((match.group(1), html_text[match.start():card_end(html_text, match.end(), limit)]))
+    return segments
+
+
+def card_end(html_text, position, limit):
+    """End offset of a card whose opening ``<li>`` finishes at ``position``"""
+    items = 1
+    lists = 0
+    for tag in LIST_TAG_PATTERN.finditer(html_text, position, limit):
+        closing, name = tag.group(1), tag.group(2).lower()
+        if name == "li":
+            items += -1 if closing else 1
+            if not items:
+                return tag.end()
+        elif not closing:
+            lists += 1
+        elif lists:
+            lists -= 1
+        else:
+            return tag.start()  # The card's own list closed without a </li>
+    return limit
+
+
+class CardHashIndex:
+    """Compact property_id -> card digest index persisted across runs
+
+    Digests are appended to a tab-separated file as records are written, so
+    an interrupted run never marks a card as done before it reached the sink.
+    ``save`` rewrites the file with one line per listing. Several jobs may
+    share the file: writes hold a lock on ``<path>.lock`` and ``save`` merges
+    this index's own updates into what is on disk, so no job drops another's
+    digests.
+    """
+    def __init__(self, path=DEFAULT_CARD_INDEX_PATH):
+        self.path = path
+        self.lock_path = f"{path}.lock"
+        self.hashes = self._read()
+        self.updated = {}  # Digests written by this index, reapplied over the file on save
+        self._lock = threading.Lock()
+        if self.hashes:
+            logger.info(f"Loaded {len(self.hashes)} card hashes from {path}")
+
+    def _read(self):
+        hashes = {}
+        if os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    property_id, _, card_hash = line.rstrip("\n").partition("\t")
+                    if card_hash:
+                        hashes[property_id] = card_hash
+        return hashes
+
+    @contextmanager
+    def _file_lock(self):
+        with open(self.lock_path, "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def __len__(self):
+        return len(self.hashes)
+
+    def is_unchanged(self, property_id, card_hash):
+        return property_id is not None and self.hashes.get(str(property_id)) == card_hash
+
+    def update(self, pairs):
+        """Record ``(property_id, card_hash)`` pairs for cards that were just written"""
+        pairs = [(str(property_id), card_hash) for property_id, card_hash in pairs
+                 if card_hash and self.hashes.get(str(property_id)) != card_hash]
+        if not pairs:
+            return
+        with self._lock, self._file_lock():
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write("".join(f"{property_id}\t{card_hash}\n" for property_id, card_hash in pairs))
+            self.hashes.update(pairs)
+            self.updated.update(pairs)
+
+    def save(self):
+        """Compact the append log down to the latest digest per listing, keeping other jobs' digests"""
+        with self._lock, self._file_lock():
+            hashes = self._read()
+            hashes.update(self.updated)
+            temp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                f.write("".join(f"{property_id}\t{card_hash}\n" for property_id, card_hash in hashes.items()))
+            os.replace(temp_path, self.path)
+            self.hashes = hashes
+
+
+def _hash_pair(key):
+    hashed = hashlib.blake2b(key.encode("utf-8", "replace"), digest_size=16).digest()
+    return int.from_bytes(hashed[:8], "little"), int.from_bytes(hashed[8:], "little")
+
+
+class BloomFilter:
+    """Fixed-capacity Bloom filter over strings
+
+    Bit positions come from one blake2b digest via enhanced double hashing,
+    which keeps the false positive rate at its target even for small filters.
+    """
+    def __init__(self, capacity, error_rate):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, hash_pair):
+        x, y = hash_pair[0] % self.size, hash_pair[1] % self.size
+        for i in range(self.hash_count):
+            yield x
+            x = (x + y) % self.size
+            y = (y + i) % self.size
+
+    def __contains__(self, key):
+        return self.contains_hashed(_hash_pair(key))
+
+    def contains_hashed(self, hash_pair):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(hash_pair))
+
+    def add(self, key):
+        self.add_hashed(_hash_pair(key))
+
+    def add_hashed(self, hash_pair):
+        for position in self._positions(hash_pair):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+
+class SeenSet:
+    """In-run set of property_ids: exact, or a growing Bloom filter for unbounded runs
+
+    The Bloom variant stacks filters of doubling capacity and halving error
+    rate, so memory stays a few bytes per listing while the overall false
+    positive rate stays under ``error_rate``; a false positive only means one
+    listing is treated as a duplicate.
+    """
+    def __init__(self, exact=True, capacity=100000, error_rate=1e-6):
+        self.exact = exact
+        self._lock = threading.Lock()
+        self._keys = set() if exact else None
+        self._filters = [] if exact else [BloomFilter(capacity, error_rate / 2)]
+
+    def __len__(self):
+        return len(self._keys) if self.exact else sum(bloom.count for bloom in self._filters)
+
+    def add(self, key):
+        """Add ``key``; returns False when it had already been seen"""
+        key = str(key)
+        with self._lock:
+            if self.exact:
+                if key in self._keys:
+                    return False
+                self._keys.add(key)
+                return True
+            hash_pair = _hash_pair(key)
+            if any(bloom.contains_hashed(hash_pair) for bloom in self._filters):
+                return False
+            current = self._filters[-1]
+            if current.count >= current.capacity:
+                current = BloomFilter(current.capacity * 2, current.error_rate / 2)
+                self._filters.append(current)
+            current.add_hashed(hash_pair)
+            return True
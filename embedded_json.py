@@ -0,0 +1,168 @@
+import json
+import logging
+import re
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, the stdlib parser gives the same result more slowly
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+NEXT_DATA_PATTERN = re.compile(
+    r'<script[^>]*\bid=["\']__NEXT_DATA__["\'][^>]*>(.*?)</script>', re.S | re.I)
+JSON_LD_PATTERN = re.compile(
+    r'<script[^>]*\btype=["\']application/ld\+json["\'][^>]*>(.*?)</script>', re.S | re.I)
+BAYUT_LISTING_ID_PATTERN = re.compile(r'details-(\d+)')
+
+
+def loads(text):
+    """Parse JSON with orjson when it is installed"""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def extract_next_data(html_text):
+    """Return the parsed Next.js ``__NEXT_DATA__`` payload of a page, or None"""
+    match = NEXT_DATA_PATTERN.search(html_text)
+    if not match:
+        return None
+    try:
+        return loads(match.group(1))
+    except ValueError as e:
+        logger.warning(f"Could not parse __NEXT_DATA__ payload: {e}")
+        return None
+
+
+def extract_json_ld(html_text):
+    """Return every JSON-LD object on a page, flattening top-level arrays and @graph lists"""
+    objects = []
+    for match in JSON_LD_PATTERN.finditer(html_text):
+        try:
+            data = loads(match.group(1))
+        except ValueError:
+            continue
+        items = data if isinstance(data, list) else [data]
+        for item in items:
+            if isinstance(item, dict) and isinstance(item.get("@graph"), list):
+                objects.extend(node for node in item["@graph"] if isinstance(node, dict))
+            elif isinstance(item, dict):
+                objects.append(item)
+    return objects
+
+
+def _dig(data, *path):
+    for key in path:
+        if not isinstance(data, dict):
+            return None
+        data = data.get(key)
+    return data
+
+
+def _with_thousands(value):
+    if isinstance(value, (int, float)):
+        return f"{value:,.0f}"
+    return str(value)
+
+
+def map_propertyfinder_listing(listing):
+    """Map one Property Finder search listing to the card field names used by scrape_single_page"""
+    prop = listing.get("property", listing)
+    fields = {}
+    fields["property_type"] = prop.get("property_type") or "N/A"
+
+    price = prop.get("price") or {}
+    if isinstance(price, dict) and price.get("value") is not None:
+        fields["price"] = f"{_with_thousands(price['value'])} {price.get('currency', 'AED')}"
+    else:
+        fields["price"] = "N/A"
+
+    fields["title"] = prop.get("title") or "N/A"
+    fields["location"] = _dig(prop, "location", "full_name") or "N/A"
+
+    size = prop.get("size") or {}
+    if isinstance(size, dict) and size.get("value") is not None:
+        fields["area"] = f"{_with_thousands(size['value'])} {size.get('unit', 'sqft')}"
+    else:
+        fields["area"] = "N/A"
+
+    url = prop.get("share_url") or prop.get("details_path") or "N/A"
+    if url != "N/A" and not url.startswith("http"):
+        url = f"https://www.propertyfinder.ae{url}"
+    fields["property_url"] = url
+
+    listing_level = prop.get("listing_level")
+    fields["listing_status"] = listing_level.title() if listing_level and listing_level != "standard" else "N/A"
+    fields["is_new"] = "New" if prop.get("is_new_insert") or prop.get("is_new") else "N/A"
+    fields["listed_time"] = prop.get("listed_date") or "N/A"
+
+    phone = next((option.get("value") for option in prop.get("contact_options") or []
+                  if isinstance(option, dict) and option.get("type") == "phone"), None)
+    fields["phone"] = phone or "N/A"
+
+    images = prop.get("images")
+    image_count = prop.get("images_count", len(images) if isinstance(images, list) else None)
+    fields["listing_image_count"] = str(image_count) if image_count is not None else "N/A"
+
+    bedrooms = prop.get("bedrooms")
+    if bedrooms in (None, ""):
+        fields["bedrooms"] = "N/A"
+    elif str(bedrooms).lower() in ("0", "studio"):
+        fields["bedrooms"] = "Studio"
+    else:
+        fields["bedrooms"] = f"{bedrooms} Beds"
+    bathrooms = prop.get("bathrooms")
+    fields["bathrooms"] = f"{bathrooms} Baths" if bathrooms not in (None, "") else "N/A"
+
+    fields["property_id"] = str(prop["id"]) if prop.get("id") is not None else None
+    return fields
+
+
+def extract_propertyfinder_listings(html_text):
+    """Return mapped card fields from a results page's embedded JSON, or None if it has none"""
+    next_data = extract_next_data(html_text)
+    listings = _dig(next_data, "props", "pageProps", "searchResult", "listings")
+    if not isinstance(listings, list):
+        return None
+    return [map_propertyfinder_listing(listing) for listing in listings
+            if isinstance(listing, dict) and listing.get("listing_type", "property") == "property"]
+
+
+def map_bayut_json_ld(json_data):
+    """Map a Bayut listing's JSON-LD object to the fields read by BayutPropertyScraper
+
+    JSON-LD has no agent reference and often no offer price, so Reference
+    holds the listing id from the URL and Price may be None; callers fill
+    both from the card's visible HTML when they have it.
+    """
+    address = json_data.get("address") or {}
+    listing_id = BAYUT_LISTING_ID_PATTERN.search(str(json_data.get("url", "")))
+    offers = json_data.get("offers") or {}
+    if isinstance(offers, list):
+        offers = offers[0] if offers else {}
+    price = offers.get("price")
+    data_dict = {
+        "Title": json_data.get("name"),
+        "URL": json_data.get("url", ""),
+        "Latitude": _dig(json_data, "geo", "latitude"),
+        "Longitude": _dig(json_data, "geo", "longitude"),
+        "Size": _dig(json_data, "floorSize", "value"),
+        "Unit": _dig(json_data, "floorSize", "unitText"),
+        "Rooms": _dig(json_data, "numberOfRooms", "value"),
+        "Bathrooms": json_data.get("numberOfBathroomsTotal"),
+        "Locality": address.get("addressLocality"),
+        "Region": address.get("addressRegion"),
+        "Image": json_data.get("image"),
+        "Price": _with_thousands(price) if price is not None else None,
+        "Location": ", ".join(part for part in (address.get("addressLocality"), address.get("addressRegion")) if part) or None,
+        "Reference": listing_id.group(1) if listing_id else None,
+    }
+    return data_dict
+
+
+def extract_bayut_listings(html_text):
+    """Return Bayut listing records from a page's JSON-LD blocks, or None if it has none"""
+    listings = [map_bayut_json_ld(item) for item in extract_json_ld(html_text)
+                if "/property/" in str(item.get("url", ""))]
+    return listings or None
@@ -0,0 +1,89 @@
+# Each rule is (field, tag, attribute, match, value, extract).
+#   match:   "equals" | "contains" (substring of the attribute, class lists joined by spaces)
+#   extract: "text" | "href" | "all" (every matching element, in document order)
+# Several rules for the same field are tried in order; the first rule that
+# matched anywhere in the card wins, mirroring the old ``find(...) or find(...)``.
+CARD_FIELDS = [
+    ("property_type", "p", "data-testid", "equals", "property-card-type", "text"),
+    ("price", "p", "data-testid", "equals", "property-card-price", "text"),
+    ("title", "h2", "class", "contains", "title", "text"),
+    ("title", "h2", None, None, None, "text"),
+    ("location", "p", "class", "contains", "location", "text"),
+    ("area", "p", "data-testid", "equals", "property-card-spec-area", "text"),
+    ("link", "a", "data-testid", "equals", "property-card-link", "href"),
+    ("link", "a", None, None, None, "href"),
+    ("listing_status", "p", "class", "contains", "listing-level", "text"),
+    ("is_new", "button", "data-testid", "equals", "property-card-tag", "text"),
+    ("listed_time", "p", "class", "contains", "publish-info", "text"),
+    ("phone", "a", "data-testid", "equals", "property-card-contact-action-CALL", "href"),
+    ("listing_image_count", "span", "class", "contains", "image-count", "text"),
+    ("specs", "p", "data-testid", "contains", "property-card-spec", "all"),
+]
+
+
+def _attribute_text(element, attribute):
+    value = element.attrs.get(attribute)
+    if isinstance(value, (list, tuple)):
+        return " ".join(value)
+    return value
+
+
+def _compile_predicate(attribute, match, value):
+    if attribute is None:
+        return lambda element: True
+    if match == "equals":
+        return lambda element: _attribute_text(element, attribute) == value
+    if match == "contains":
+        return lambda element: value in (_attribute_text(element, attribute) or "")
+    raise ValueError(f"Unknown match type {match!r}")
+
+
+class CardExtractor:
+    """Compile a field table once, then fill every field with one walk over each card"""
+    def __init__(self, fields=CARD_FIELDS):
+        self.rules = []
+        self.rules_by_tag = {}
+        for index, (field, tag, attribute, match, value, extract) in enumerate(fields):
+            self.rules.append((field, extract))
+            self.rules_by_tag.setdefault(tag, []).append((index, extract == "all", _compile_predicate(attribute, match, value)))
+        self.extract_by_field = {field: extract for field, extract in self.rules}
+
+    def match(self, card):
+        """Walk the card once and return {field: element or [elements]} for matched fields"""
+        firsts = {}
+        alls = {}
+        rules_by_tag = self.rules_by_tag
+        for element in card.descendants:
+            rules = rules_by_tag.get(element.name)
+            if not rules:
+                continue
+            for index, collect_all, predicate in rules:
+                if collect_all:
+                    if predicate(element):
+                        alls.setdefault(index, []).append(element)
+                elif index not in firsts and predicate(element):
+                    firsts[index] = element
+
+        matched = {}
+        for index, (field, extract) in enumerate(self.rules):
+            if field in matched:
+                continue
+            if extract == "all":
+                if index in alls:
+                    matched[field] = alls[index]
+            elif index in firsts:
+                matched[field] = firsts[index]
+        return matched
+
+    def extract(self, card):
+        """Return raw field values: stripped text, href strings or lists of stripped texts"""
+        values = {}
+        for field, element in self.match(card).items():
+            extract = self.extract_by_field[field]
+            if extract == "text":
+                values[field] = element.text.strip()
+            elif extract == "href":
+                values[field] = element.get("href")
+            else:
+                values[field] = [item.text.strip() for item in element]
+        return values
@@ -0,0 +1,172 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from rate_limiter import ThrottledSession
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = ".http_cache.db"
+DEFAULT_CACHE_MAX_BYTES = 512 * 1024 * 1024
+DEFAULT_CACHE_TTL = 6 * 60 * 60  # Seconds a stored page is served without asking the server
+STORED_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Cache-Control")
+
+
+class HttpCache:
+    """On-disk response cache with validators, a freshness TTL and LRU eviction
+
+    Entries younger than ``ttl`` seconds are served without touching the
+    network. Older ones are revalidated with If-None-Match/If-Modified-Since
+    and a 304 turns back into the stored page. Once the stored bodies pass
+    ``max_bytes`` the least recently used entries are dropped. The file is a
+    small SQLite database in WAL mode so several scrapers, threads and worker
+    processes can share it; writers wait up to 30 seconds for each other.
+    """
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes=DEFAULT_CACHE_MAX_BYTES, ttl=DEFAULT_CACHE_TTL):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "url TEXT PRIMARY KEY, headers TEXT NOT NULL, encoding TEXT, body BLOB NOT NULL, "
+                "size INTEGER NOT NULL, stored_at REAL NOT NULL, accessed_at REAL NOT NULL)")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+        self.total_bytes = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def lookup(self, url):
+        """Return ``(response, is_fresh)`` for a stored url, or None"""
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT headers, encoding, body, stored_at FROM responses WHERE url = ?", (url,)).fetchone()
+            if row is None:
+                return None
+            with self.connection:
+                self.connection.execute("UPDATE responses SET accessed_at = ? WHERE url = ?", (time.time(), url))
+        headers, encoding, body, stored_at = row
+        return self._response(url, json.loads(headers), encoding, body), time.time() - stored_at < self.ttl
+
+    @staticmethod
+    def _response(url, headers, encoding, body):
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = "OK"
+        response.url = url
+        response.headers = CaseInsensitiveDict(headers)
+        response.encoding = encoding
+        response._content = body
+        response._content_consumed = True
+        response.from_cache = True
+        return response
+
+    def store(self, url, response):
+        if "no-store" in response.headers.get("Cache-Control", ""):
+            return
+        body = response.content
+        headers = {name: response.headers[name] for name in STORED_HEADERS if name in response.headers}
+        now = time.time()
+        with self._lock:
+            with self.connection:
+                previous = self.connection.execute("SELECT size FROM responses WHERE url = ?", (url,)).fetchone()
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO responses (url, headers, encoding, body, size, stored_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (url, json.dumps(headers), response.encoding, body, len(body), now, now))
+                self.total_bytes += len(body) - (previous[0] if previous else 0)
+                if self.total_bytes > self.max_bytes:
+                    self._evict()
+
+    def _evict(self):
+        """Drop least recently used entries until the cache is back under 90% of its budget"""
+        target = self.max_bytes * 0.9
+        evicted = 0
+        for url, size in self.connection.execute(
+                "SELECT url, size FROM responses ORDER BY accessed_at").fetchall():
+            if self.total_bytes <= target:
+                break
+            self.connection.execute("DELETE FROM responses WHERE url = ?", (url,))
+            self.total_bytes -= size
+            evicted += 1
+        logger.info(f"HTTP cache evicted {evicted} pages to stay under {self.max_bytes / 1024 / 1024:.0f} MB")
+
+    def touch(self, url):
+        """Restart an entry's freshness window after the server confirmed it with a 304"""
+        with self._lock:
+            with self.connection:
+                self.connection.execute(
+                    "UPDATE responses SET stored_at = ?, accessed_at = ? WHERE url = ?", (time.time(), time.time(), url))
+
+    def stats(self):
+        return {"hits": self.hits, "revalidated": self.revalidated, "misses": self.misses,
+                "stored_mb": self.total_bytes / 1024 / 1024}
+
+    def close(self):
+        with self._lock:
+            if self.connection is not None:
+                self.connection.close()
+                self.connection = None
+
+
+class CachingSession(ThrottledSession):
+    """ThrottledSession that answers GETs from an HttpCache when it can
+
+    Fresh hits skip the rate limiter entirely; revalidations still take a
+    token but a 304 carries no body. ``cache_filter(url)`` limits caching to
+    pages worth keeping (detail pages rather than ever-changing result pages).
+    Streamed responses are read fully before they are stored. A cache that
+    stays locked or fails is skipped with a warning; the page is fetched anyway.
+    """
+    def __init__(self, cache, cache_filter=None, rate_limiter=None, max_retries=3, timeout=None):
+        super().__init__(rate_limiter, max_retries=max_retries, timeout=timeout)
+        self.cache = cache
+        self.cache_filter = cache_filter
+
+    def request(self, method, url, *args, **kwargs):
+        if method.upper() != "GET" or (self.cache_filter is not None and not self.cache_filter(url)):
+            return super().request(method, url, *args, **kwargs)
+
+        try:
+            cached = self.cache.lookup(url)
+        except sqlite3.Error as e:
+            logger.warning(f"HTTP cache lookup failed for {url}, fetching it: {e}")
+            cached = None
+        if cached is not None:
+            cached_response, is_fresh = cached
+            if is_fresh:
+                self.cache.hits += 1
+                return cached_response
+            headers = dict(kwargs.pop("headers", None) or {})
+            if "ETag" in cached_response.headers:
+                headers["If-None-Match"] = cached_response.headers["ETag"]
+            if "Last-Modified" in cached_response.headers:
+                headers["If-Modified-Since"] = cached_response.headers["Last-Modified"]
+            kwargs["headers"] = headers
+
+        response = super().request(method, url, *args, **kwargs)
+        if cached is not None and response.status_code == 304:
+            response.close()
+            try:
+                self.cache.touch(url)
+            except sqlite3.Error as e:
+                logger.warning(f"HTTP cache could not refresh {url}: {e}")
+            self.cache.revalidated += 1
+            return cached[0]
+        self.cache.misses += 1
+        if response.status_code == 200:
+            try:
+                self.cache.store(url, response)
+            except sqlite3.Error as e:
+                logger.warning(f"HTTP cache could not store {url}: {e}")
+        return response
@@ -0,0 +1,170 @@
+import json
+import logging
+import multiprocessing
+import os
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from main import job_config, run_job
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_JOBS_DIR = ".jobs"
+DEFAULT_JOB_WORKERS = 2
+ACTIVE_STATUSES = ("queued", "running", "stopping")
+
+
+def _now():
+    return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+
+def _write_state(path, state):
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(temp_path, path)
+
+
+def _read_state(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class StopFile:
+    """Stop event backed by a marker file, visible to any process and across restarts"""
+    def __init__(self, path):
+        self.path = path
+
+    def is_set(self):
+        return os.path.exists(self.path)
+
+    def set(self):
+        open(self.path, "a").close()
+
+
+def run_managed_job(state_path, job, stop_path):
+    """Pool entry point: run one job, recording its status and result in ``state_path``"""
+    state = _read_state(state_path) or {}
+    state.update(status="running", pid=os.getpid(), started_at=_now())
+    _write_state(state_path, state)
+    try:
+        result = run_job(job, stop_event=StopFile(stop_path))
+        state.update(status="stopped" if result["stopped"] else "done", result=result)
+    except Exception as e:
+        logger.error(f"Job {state.get('id')} failed: {e}")
+        state.update(status="failed", error=str(e))
+    state["finished_at"] = _now()
+    _write_state(state_path, state)
+    return state
+
+
+class JobManager:
+    """Runs scrape jobs concurrently in a worker pool and keeps their state on disk
+
+    Each job gets ``<jobs_dir>/<id>.json`` (status, config, result), its own
+    log, progress file, checkpoint and records file, so any number of
+    dashboard sessions can list, follow and stop the same jobs and a page
+    reload loses nothing. Stopping is cooperative: the job finishes the page
+    in hand and saves what it has. Jobs left queued or running by a previous
+    server are marked ``interrupted``; what they wrote stays in their records file.
+    """
+    def __init__(self, jobs_dir=DEFAULT_JOBS_DIR, workers=DEFAULT_JOB_WORKERS):
+        self.jobs_dir = jobs_dir
+        os.makedirs(jobs_dir, exist_ok=True)
+        self.pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        self.futures = {}
+        self._lock = threading.Lock()
+        for state in self.jobs():
+            if state["status"] in ACTIVE_STATUSES:
+                state.update(status="interrupted", finished_at=_now())
+                _write_state(self.state_path(state["id"]), state)
+
+    def state_path(self, job_id):
+        return os.path.join(self.jobs_dir, f"{job_id}.json")
+
+    def stop_path(self, job_id):
+        return os.path.join(self.jobs_dir, f"{job_id}.stop")
+
+    def submit(self, config, name=None):
+        """Queue a job spec (keys of main.DEFAULT_JOB); returns the new job id"""
+        job_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+        job = job_config(config)
+        # Per-job files keep concurrent runs from sharing a checkpoint or an output file
+        job["records_file"] = job["records_file"] or f"property_data_{job_id}.jsonl"
+        job["checkpoint_path"] = os.path.join(self.jobs_dir, f"{job_id}.checkpoint.json")
+        job["progress_file"] = os.path.join(self.jobs_dir, f"{job_id}.progress.jsonl")
+        job["log_file"] = os.path.join(self.jobs_dir, f"{job_id}.log")
+        state = {"id": job_id, "name": name or job_id, "status": "queued", "config": job,
+                 "submitted_at": _now(), "log_file": job["log_file"], "progress_file": job["progress_file"]}
+        _write_state(self.state_path(job_id), state)
+        with self._lock:
+            future = self.pool.submit(run_managed_job, self.state_path(job_id), job, self.stop_path(job_id))
+            self.futures[job_id] = future
+        future.add_done_callback(lambda f: self._on_done(job_id, f))
+        logger.info(f"📥 Queued job {job_id} ({state['name']})")
+        return job_id
+
+    def submit_shards(self, config, shards, name=None):
+        """Queue one job per shard from shard_crawl.plan_page_shards/plan_query_shards"""
+        return [self.submit(dict(config, base_url=shard["base_url"], start_page=shard["start_page"],
+                                 max_pages=shard["max_pages"]),
+                            name=f"{name or 'shard'} {shard['name']}") for shard in shards]
+
+    def _on_done(self, job_id, future):
+        # A worker that died never wrote its final state
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is None:
+            return
+        state = _read_state(self.state_path(job_id)) or {"id": job_id}
+        if state.get("status") in ACTIVE_STATUSES:
+            state.update(status="failed", error=str(error), finished_at=_now())
+            _write_state(self.state_path(job_id), state)
+
+    def stop(self, job_id):
+        """Cancel a queued job, or ask a running one to stop and save its partial data"""
+        state = self.job(job_id)
+        if state is None or state["status"] not in ACTIVE_STATUSES:
+            return False
+        with self._lock:
+            future = self.futures.get(job_id)
+        if future is not None and future.cancel():
+            state.update(status="cancelled", finished_at=_now())
+            _write_state(self.state_path(job_id), state)
+            return True
+        StopFile(self.stop_path(job_id)).set()
+        logger.info(f"⏹️ Stop requested for job {job_id}")
+        return True
+
+    def job(self, job_id):
+        return _read_state(self.state_path(job_id))
+
+    def jobs(self):
+        """Every job on disk, newest first; a stop that was asked for shows as ``stopping``"""
+        states = []
+        for filename in os.listdir(self.jobs_dir):
+            if not filename.endswith(".json") or filename.endswith(".checkpoint.json"):
+                continue
+            state = _read_state(os.path.join(self.jobs_dir, filename))
+            if state is None or "id" not in state:
+                continue
+            if state["status"] in ("queued", "running") and os.path.exists(self.stop_path(state["id"])):
+                state["status"] = "stopping"
+            states.append(state)
+        return sorted(states, key=lambda state: state["submitted_at"], reverse=True)
+
+    def active_jobs(self):
+        return [state for state in self.jobs() if state["status"] in ACTIVE_STATUSES]
+
+    def shutdown(self, stop_running=True):
+        """Ask running jobs to stop, then wait for them to save"""
+        if stop_running:
+            for state in self.active_jobs():
+                self.stop(state["id"])
+        self.pool.shutdown(wait=True)
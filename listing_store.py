@@ -0,0 +1,156 @@
+import logging
+import os
+import sqlite3
+from contextlib import closing
+from datetime import datetime
+
+import pandas as pd
+
+from normalize import parse_area, parse_price
+from sinks import RecordSink
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STORE_PATH = "listings.db"
+SYNTHETIC_ID_PREFIX = "prop_p"  # Placeholder ids for cards without a data-id: prop_p<page>_<index>
+
+
+def is_synthetic_id(property_id):
+    """True for ids made up from a card's page position rather than read from the site"""
+    return str(property_id).startswith(SYNTHETIC_ID_PREFIX)
+
+
+class ListingStore(RecordSink):
+    """SQLite listing database keyed on property_id, shared by every run
+
+    Each batch is upserted with one ``executemany`` in a single transaction:
+    new listings get ``first_seen``, known ones have their fields refreshed
+    and ``last_seen`` moved forward. A row is appended to ``price_history``
+    whenever a listing is first seen or its price text changes. The database
+    runs in WAL mode so the dashboard can read while a scrape is writing.
+    """
+    extension = ".db"
+
+    def __init__(self, path=DEFAULT_STORE_PATH, columns=(), append=True):
+        super().__init__(path, append=True)
+        self.columns = [column for column in columns if column != 'property_id']
+        self.run_started = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        # Concurrent jobs share the store; writers wait for each other instead of failing
+        self.connection = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+
+    def _create_schema(self):
+        with self.connection:
+            # One writer at a time, so two jobs never add the same column
+            self.connection.execute("BEGIN IMMEDIATE")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS listings ("
+                "property_id TEXT PRIMARY KEY, first_seen TEXT NOT NULL, last_seen TEXT NOT NULL, "
+                "price_aed REAL, area_sqft REAL)")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS price_history ("
+                "property_id TEXT NOT NULL, observed_at TEXT NOT NULL, price TEXT, price_aed REAL, "
+                "PRIMARY KEY (property_id, observed_at))")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS listings_last_seen ON listings (last_seen)")
+            existing = {row[1] for row in self.connection.execute("PRAGMA table_info(listings)")}
+            for column in self.columns:
+                if column not in existing:
+                    self.connection.execute(f'ALTER TABLE listings ADD COLUMN "{column}" TEXT')
+
+    def _rows(self, records):
+        # Positional placeholder ids name a different listing every run, so they are never stored
+        records = [record for record in records if record.get('property_id') not in (None, '', 'N/A')
+                   and not is_synthetic_id(record['property_id'])]
+        if not records:
+            return []
+        price_values = parse_price(pd.Series([record.get('price') for record in records], dtype="string"))
+        area_values = parse_area(pd.Series([record.get('area') for record in records], dtype="string"))
+        price_values = price_values.astype(object).where(price_values.notna(), None)
+        area_values = area_values.astype(object).where(area_values.notna(), None)
+        now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        rows = []
+        for record, price_aed, area_sqft in zip(records, price_values, area_values):
+            values = [None if record.get(column) is None else str(record.get(column)) for column in self.columns]
+            seen_at = str(record.get('scrape_date') or now)
+            rows.append((str(record['property_id']), seen_at, price_aed, area_sqft, values, record.get('price')))
+        return rows
+
+    def _write(self, records):
+        rows = self._rows(records)
+        if not rows:
+            return
+        quoted = [f'"{column}"' for column in self.columns]
+        insert_columns = ", ".join(["property_id", "first_seen", "last_seen", "price_aed", "area_sqft"] + quoted)
+        placeholders = ", ".join("?" * (5 + len(self.columns)))
+        # Later batches may lack detail fields, so never overwrite a value with NULL
+        updates = ", ".join(
+            ["last_seen = MAX(listings.last_seen, excluded.last_seen)",
+             "price_aed = COALESCE(excluded.price_aed, listings.price_aed)",
+             "area_sqft = COALESCE(excluded.area_sqft, listings.area_sqft)"]
+            + [f"{column} = COALESCE(excluded.{column}, listings.{column})" for column in quoted])
+        with self.connection:
+            if 'price' in self.columns:
+                self.connection.executemany(
+                    "INSERT OR IGNORE INTO price_history (property_id, observed_at, price, price_aed) "
+                    "SELECT ?, ?, ?, ? WHERE NOT EXISTS "
+                    "(SELECT 1 FROM listings WHERE property_id = ? AND price IS ?)",
+                    [(property_id, seen_at, price, price_aed, property_id, price)
+                     for property_id, seen_at, price_aed, _, _, price in rows])
+            self.connection.executemany(
+                f"INSERT INTO listings ({insert_columns}) VALUES ({placeholders}) "
+                f"ON CONFLICT(property_id) DO UPDATE SET {updates}",
+                [(property_id, seen_at, seen_at, price_aed, area_sqft, *values)
+                 for property_id, seen_at, price_aed, area_sqft, values, _ in rows])
+
+    def mark_seen(self, property_ids):
+        """Move last_seen forward for listings that were skipped as unchanged"""
+        now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        with self._lock:
+            with self.connection:
+                self.connection.executemany("UPDATE listings SET last_seen = ? WHERE property_id = ?",
+                                            [(now, str(property_id)) for property_id in property_ids])
+
+    def close(self):
+        with self._lock:
+            if self.connection is not None:
+                self.connection.close()
+                self.connection = None
+
+    def query(self, sql, params=()):
+        """Run a read query against the store and return a DataFrame"""
+        with self._lock:
+            return pd.read_sql_query(sql, self.connection, params=params)
+
+    def read_frame(self, all_runs=False):
+        """Listings seen by this run (or every listing ever stored with ``all_runs``)"""
+        if all_runs:
+            return self.query("SELECT * FROM listings ORDER BY last_seen")
+        return self.query("SELECT * FROM listings WHERE last_seen >= ? ORDER BY last_seen", (self.run_started,))
+
+    def known_ids(self):
+        """Every property_id already in the store"""
+        with self._lock:
+            return {row[0] for row in self.connection.execute("SELECT property_id FROM listings")
+                    if not is_synthetic_id(row[0])}
+
+    def price_history(self, property_id=None):
+        if property_id is None:
+            return self.query("SELECT * FROM price_history ORDER BY property_id, observed_at")
+        return self.query("SELECT * FROM price_history WHERE property_id = ? ORDER BY observed_at",
+                          (str(property_id),))
+
+
+def load_known_ids(path=DEFAULT_STORE_PATH):
+    """property_ids already stored at ``path``; empty when no store exists yet
+
+    Placeholder ids that older stores may hold are left out: they match any
+    card at the same page position, so treating them as known would end an
+    incremental run before it scraped anything.
+    """
+    if not os.path.exists(path):
+        return set()
+    with closing(sqlite3.connect(path)) as connection:
+        return {row[0] for row in connection.execute("SELECT property_id FROM listings")
+                if not is_synthetic_id(row[0])}
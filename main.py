@@ -1,30 +1,135 @@
-from bs4 import BeautifulSoup
-import requests
 import os
+import sys
 import pandas as pd
 from datetime import datetime
-import time
 import logging
+import threading
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from rate_limiter import HostRateLimiter
+from transport import TransportConfig, build_session, connection_stats, resize_pool
+from parsing import DEFAULT_PARSER, PARSER_BACKENDS, parse_html, resolve_parser
+from extraction import CardExtractor
+from embedded_json import extract_propertyfinder_listings
+from streaming import StreamingCardParser, StreamingDetailParser
+from sinks import MultiSink, open_sink
+from listing_store import DEFAULT_STORE_PATH, SYNTHETIC_ID_PREFIX, ListingStore, load_known_ids
+from http_cache import HttpCache
+from dedup import CARD_HASH_FIELD, DEFAULT_CARD_INDEX_PATH, CardHashIndex, SeenSet, card_segments, digest, fields_digest
+from checkpoint import DEFAULT_CHECKPOINT_PATH, ScrapeCheckpoint
+from excel_export import write_workbook
+from normalize import write_parquet
+from progress import ProgressReporter
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Concurrent listing fetch defaults used by main() and unlimited_scrape()
+DEFAULT_CONCURRENCY = 4
+DEFAULT_REQUESTS_PER_SECOND = 2.0
+DEFAULT_DETAIL_WORKERS = 4
+DETAIL_QUEUE_SIZE = 1000  # Cards waiting on detail pages; pagination blocks while the queue is full
+DEFAULT_KNOWN_PAGES_TO_STOP = 2  # Incremental runs stop after this many pages of already-stored listings
+DETAIL_PAGE_MARKER = "/plp/"  # Only detail page URLs contain this, so only they are cached
+LEGACY_PAGE_DELAY = 1.5  # Starting pace (seconds per request) when no rate budget is given
+
+# Column order for exports; any other fields follow at the end
+PREFERRED_COLUMNS = [
+    'scrape_date', 'page_number', 'property_index_on_page', 'global_property_index', 
+    'property_id', 'title', 'property_type', 'price', 'location', 'area', 
+    'bedrooms', 'bathrooms', 'listing_status', 'is_new', 'listed_time', 
+    'phone', 'property_url', 'listing_image_count'
+]
+DETAILED_COLUMNS = [
+    'detailed_title', 'detailed_location', 'detailed_price', 
+    'description', 'detailed_image_count'
+]
+
+class DetailEnrichmentPipeline:
+    """Worker pool that fetches detail pages off a bounded queue while pagination carries on"""
+    def __init__(self, fetch_details, workers=DEFAULT_DETAIL_WORKERS, on_result=None, max_queued=DETAIL_QUEUE_SIZE):
+        self.fetch_details = fetch_details
+        self.on_result = on_result
+        self.workers = max(1, int(workers))
+        self.tasks = queue.Queue(maxsize=max_queued)
+        self._threads = []
+
+    def start(self):
+        for n in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"detail-worker-{n + 1}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def submit(self, property_info):
+        """Queue a listing card for enrichment, waiting while the queue is full"""
+        self.tasks.put(property_info)
+
+    def _work(self):
+        while True:
+            task = self.tasks.get()
+            try:
+                if task is None:
+                    return
+                detailed_data = self.fetch_details(task["property_url"])
+                if self.on_result:
+                    self.on_result(task, detailed_data)
+            except Exception as e:
+                logger.error(f"Detail worker failed on {task.get('property_url') if task else None}: {e}")
+            finally:
+                self.tasks.task_done()
+
+    def close(self):
+        """Drain the queue and stop the workers"""
+        for _ in self._threads:
+            self.tasks.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
 class PropertyScraper:
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
+    def __init__(self, transport=None, parser=DEFAULT_PARSER, json_first=True, streaming=False,
+                 sink=None, keep_records=True, cache=None, card_index=None, progress=None):
+        self.transport = transport or TransportConfig()
+        self.parser = resolve_parser(parser)
+        self.card_extractor = CardExtractor()
+        self.json_first = json_first
+        self.streaming = streaming  # Parse pages incrementally instead of building whole trees
+        self.rate_limiter = HostRateLimiter(initial_rate=1.0 / LEGACY_PAGE_DELAY, max_rate=1.0 / LEGACY_PAGE_DELAY)
+        # Detail pages go through the optional on-disk HttpCache; result pages are always fetched
+        self.cache = cache
+        self.session = build_session(self.transport, self.rate_limiter, cache=cache,
+                                     cache_filter=lambda url: DETAIL_PAGE_MARKER in url)
         self.properties_data = []
+        self.sink = sink  # Optional RecordSink that receives every page as soon as it is merged
+        self.keep_records = keep_records  # Set False with a sink to keep memory flat on huge runs
+        self.record_count = 0
+        self.detailed_count = 0
+        self.new_listing_count = 0  # Listings not in known_ids during an incremental run
+        self.card_index = card_index  # Optional CardHashIndex; unchanged cards are skipped entirely
+        self.unchanged_by_page = {}  # page_number -> property_ids skipped as unchanged
+        self.unchanged_count = 0
+        self.duplicate_count = 0  # Cards repeated within a run (featured/premium listings)
+        self.detail_fetches_avoided = 0
+        self.error_count = 0
+        # Structured progress events for dashboards; picked up from SCRAPER_PROGRESS_FILE by default
+        self.progress = progress if progress is not None else ProgressReporter.from_env()
+        self.pages_with_records = set()
+        self.pending_details = {}  # global_property_index -> record queued for enrichment
+        self.collect_detailed_data = False
+        self.detail_pipeline = None
+        self._data_lock = threading.Lock()
         
     def collect_property_data(self, url):
         """Collect detailed property data from individual property page"""
         try:
             logger.info(f"Collecting detailed data from: {url}")
+            if self.streaming:
+                return self.stream_property_data(url)
             response = self.session.get(url)
             response.raise_for_status()
-            soup = BeautifulSoup(response.text, "html.parser")
+            soup = parse_html(response.text, self.parser)
             
             property_data = {}
             
@@ -60,146 +165,379 @@ class PropertyScraper:
             
         except Exception as e:
             logger.error(f"Error collecting property data from {url}: {e}")
+            self.count_error()
             return {}
 
-    def scrape_single_page(self, page_url, page_number):
-        """Scrape properties from a single page"""
-        try:
-            logger.info(f"Scraping page {page_number}: {page_url}")
-            response = self.session.get(page_url)
+    def stream_property_data(self, url):
+        """Streaming variant of collect_property_data that never holds the whole page"""
+        detail_parser = StreamingDetailParser()
+        with self.session.get(url, stream=True) as response:
+            response.raise_for_status()
+            detail_parser.feed_response(response)
+        
+        property_data = {
+            "detailed_title": detail_parser.values.get("detailed_title", "No title found"),
+            "detailed_location": detail_parser.values.get("detailed_location", "No subtitle found"),
+            "description": detail_parser.values.get("description", "No description found"),
+            "detailed_price": detail_parser.values.get("detailed_price", "No price found"),
+            "detailed_image_count": detail_parser.image_count,
+        }
+        logger.info(f"Successfully collected detailed data for: {property_data['detailed_title']}")
+        return property_data
+
+    def stream_page_properties(self, page_url, page_number):
+        """Parse a results page from the socket, turning each card into a record as it closes"""
+        page_properties = []
+        
+        def on_card(land):
+            index = card_parser.cards_seen - 1
+            try:
+                card_fields = self.dom_card_fields(land)
+                card_fields["property_id"] = land.get("data-id")
+                page_properties.append(self.build_property_info(card_fields, page_number, index))
+            except Exception as e:
+                logger.error(f"Error processing property {index + 1} on page {page_number}: {e}")
+        
+        card_parser = StreamingCardParser(on_card)
+        with self.session.get(page_url, stream=True) as response:
             response.raise_for_status()
-            soup = BeautifulSoup(response.text, "html.parser")
-            
             logger.info(f"Response status: {response.status_code}")
-            
-            # Try different possible selectors for property containers
-            containers = [
-                soup.find("ul", class_="styles_desktop_containerV85pq"),
-                soup.find("ul", class_=lambda x: x and "container" in x.lower()),
-                soup.find("div", class_=lambda x: x and "property" in x.lower()),
-                soup.find_all("li", attrs={"data-testid": "list-item"}),
-                soup.find_all("li", attrs={"data-id": True}),
-                soup.find_all("article", class_=lambda x: x and "property-card" in x),
-            ]
-            
-            lands = []
-            for i, container in enumerate(containers):
-                if container:
-                    if hasattr(container, 'find_all'):
-                        lands = container.find_all("li")
-                    elif isinstance(container, list):
-                        lands = container
-                    else:
-                        lands = [container]
-                    break
-            
-            if not lands:
-                logger.warning(f"No property listings found on page {page_number}")
-                return 0
-            
-            logger.info(f"Found {len(lands)} property listings on page {page_number}")
-            
-            page_properties = []
-            
-            for i, land in enumerate(lands):
-                try:
-                    property_info = {
-                        'scrape_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                        'page_number': page_number,
-                        'property_index_on_page': i + 1,
-                        'global_property_index': len(self.properties_data) + i + 1
-                    }
-                    
-                    # Property Type
-                    property_type = land.find("p", {"data-testid": "property-card-type"})
-                    property_info["property_type"] = property_type.text.strip() if property_type else "N/A"
-                    
-                    # Price
-                    price = land.find("p", {"data-testid": "property-card-price"})
-                    property_info["price"] = price.text.strip() if price else "N/A"
-                    
-                    # Title
-                    title = land.find("h2", class_=lambda x: x and "title" in x) or land.find("h2")
-                    property_info["title"] = title.text.strip() if title else "N/A"
-                    
-                    # Location
-                    location = land.find("p", class_=lambda x: x and "location" in x)
-                    property_info["location"] = location.text.strip() if location else "N/A"
-                    
-                    # Area/Size
-                    area = land.find("p", {"data-testid": "property-card-spec-area"})
-                    property_info["area"] = area.text.strip() if area else "N/A"
-                    
-                    # Property Link
-                    property_link = land.find("a", {"data-testid": "property-card-link"}) or land.find("a")
-                    link = property_link.get("href") if property_link else "N/A"
-                    full_link = f"https://www.propertyfinder.ae{link}" if link != "N/A" and not link.startswith("http") else link
-                    property_info["property_url"] = full_link
-                    
-                    # Listing Status
-                    listing_status = land.find("p", class_=lambda x: x and "listing-level" in x)
-                    property_info["listing_status"] = listing_status.text.strip() if listing_status else "N/A"
-                    
-                    # New Tag
-                    new_tag = land.find("button", {"data-testid": "property-card-tag"})
-                    property_info["is_new"] = new_tag.text.strip() if new_tag else "N/A"
-                    
-                    # Listed time
-                    publish_info = land.find("p", class_=lambda x: x and "publish-info" in x)
-                    property_info["listed_time"] = publish_info.text.strip() if publish_info else "N/A"
-                    
-                    # Phone number
-                    call_link = land.find("a", {"data-testid": "property-card-contact-action-CALL"})
-                    property_info["phone"] = call_link.get("href").replace("tel:", "") if call_link else "N/A"
-                    
-                    # Image count from listing
-                    image_count = land.find("span", class_=lambda x: x and "image-count" in x)
-                    property_info["listing_image_count"] = image_count.text.strip() if image_count else "N/A"
-                    
-                    # Bedrooms and Bathrooms
-                    specs = land.find_all("p", {"data-testid": lambda x: x and "property-card-spec" in x})
-                    property_info["bedrooms"] = "N/A"
-                    property_info["bathrooms"] = "N/A"
-                    
-                    for spec in specs:
-                        spec_text = spec.text.strip().lower()
-                        if "bed" in spec_text:
-                            property_info["bedrooms"] = spec.text.strip()
-                        elif "bath" in spec_text:
-                            property_info["bathrooms"] = spec.text.strip()
-                    
-                    # Property ID
-                    property_info["property_id"] = land.get("data-id", f"prop_p{page_number}_{i+1}")
-                    
-                    # Collect detailed property data (optional, can be disabled for faster scraping)
-                    if full_link != "N/A" and self.collect_detailed_data:
-                        detailed_data = self.collect_property_data(full_link)
-                        property_info.update(detailed_data)
-                        time.sleep(0.5)  # Small delay between detailed requests
-                    
-                    page_properties.append(property_info)
-                    
-                except Exception as e:
-                    logger.error(f"Error processing property {i+1} on page {page_number}: {e}")
-                    continue
-            
-            # Add all properties from this page to the main list
-            self.properties_data.extend(page_properties)
+            card_parser.feed_response(response)
+        
+        if not card_parser.cards_seen:
+            logger.warning(f"No property listings found on page {page_number}")
+        else:
+            logger.info(f"Streamed {card_parser.cards_seen} property listings on page {page_number}")
+        return page_properties
+
+    def dom_card_fields(self, land):
+        """Read the card fields from a listing's DOM in a single pass"""
+        fields = self.card_extractor.extract(land)
+        card_fields = {}
+        for field in ("property_type", "price", "title", "location", "area"):
+            card_fields[field] = fields.get(field, "N/A")
+        
+        # Property Link
+        link = fields.get("link") or "N/A"
+        full_link = f"https://www.propertyfinder.ae{link}" if link != "N/A" and not link.startswith("http") else link
+        card_fields["property_url"] = full_link
+        
+        for field in ("listing_status", "is_new", "listed_time"):
+            card_fields[field] = fields.get(field, "N/A")
+        
+        # Phone number
+        call_href = fields.get("phone")
+        card_fields["phone"] = call_href.replace("tel:", "") if call_href else "N/A"
+        
+        card_fields["listing_image_count"] = fields.get("listing_image_count", "N/A")
+        
+        # Bedrooms and Bathrooms
+        card_fields["bedrooms"] = "N/A"
+        card_fields["bathrooms"] = "N/A"
+        
+        for spec_text in fields.get("specs", []):
+            if "bed" in spec_text.lower():
+                card_fields["bedrooms"] = spec_text
+            elif "bath" in spec_text.lower():
+                card_fields["bathrooms"] = spec_text
+        
+        return card_fields
+
+    def build_property_info(self, card_fields, page_number, index):
+        """Wrap a card's fields with the page bookkeeping columns"""
+        property_info = {
+            'scrape_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'page_number': page_number,
+            'property_index_on_page': index + 1,
+            'global_property_index': None  # Assigned when the page is merged
+        }
+        property_info.update(card_fields)
+        
+        # Property ID
+        if not property_info.get("property_id"):
+            property_info["property_id"] = f"{SYNTHETIC_ID_PREFIX}{page_number}_{index+1}"
+        if self.card_index is not None and CARD_HASH_FIELD not in property_info:
+            property_info[CARD_HASH_FIELD] = fields_digest(card_fields)
+        return property_info
+
+    def skip_unchanged(self, page_properties, page_number, unchanged_ids=()):
+        """Drop cards whose digest matches the card index and remember them for the page merge"""
+        if self.card_index is None:
+            return page_properties
+        unchanged_ids = list(unchanged_ids)
+        changed = []
+        for property_info in page_properties:
+            if self.card_index.is_unchanged(property_info["property_id"], property_info.get(CARD_HASH_FIELD)):
+                unchanged_ids.append(str(property_info["property_id"]))
+            else:
+                changed.append(property_info)
+        with self._data_lock:
+            self.unchanged_by_page[page_number] = unchanged_ids
+        if unchanged_ids:
+            logger.info(f"Skipped {len(unchanged_ids)} unchanged cards on page {page_number}")
+        return changed
+
+    def changed_card_properties(self, html_text, page_number):
+        """Hash each card's raw HTML and parse only the cards that changed; None if cards can't be split"""
+        segments = card_segments(html_text)
+        if not segments:
+            return None
+        logger.info(f"Found {len(segments)} property listings on page {page_number}")
+        page_properties = []
+        unchanged_ids = []
+        for i, (property_id, raw_card) in enumerate(segments):
+            card_hash = digest(raw_card)
+            if self.card_index.is_unchanged(property_id, card_hash):
+                unchanged_ids.append(property_id)
+                continue
+            try:
+                land = parse_html(raw_card, self.parser).find("li")
+                card_fields = self.dom_card_fields(land)
+                card_fields["property_id"] = property_id
+                card_fields[CARD_HASH_FIELD] = card_hash
+                page_properties.append(self.build_property_info(card_fields, page_number, i))
+            except Exception as e:
+                logger.error(f"Error processing property {i+1} on page {page_number}: {e}")
+        return self.skip_unchanged(page_properties, page_number, unchanged_ids)
+
+    def fetch_page(self, page_url, page_number):
+        """Fetch and parse a single page; fetch errors propagate, an empty page returns []"""
+        logger.info(f"Scraping page {page_number}: {page_url}")
+        if self.streaming:
+            page_properties = self.skip_unchanged(self.stream_page_properties(page_url, page_number), page_number)
             logger.info(f"Successfully processed {len(page_properties)} properties from page {page_number}")
-            
-            return len(page_properties)
-            
+            return page_properties
+        response = self.session.get(page_url)
+        response.raise_for_status()
+        logger.info(f"Response status: {response.status_code}")
+        
+        # Prefer the listing payload the page ships as JSON over DOM scraping
+        if self.json_first:
+            embedded_listings = extract_propertyfinder_listings(response.text)
+            if embedded_listings:
+                logger.info(f"Found {len(embedded_listings)} property listings in embedded JSON on page {page_number}")
+                return self.skip_unchanged([self.build_property_info(card_fields, page_number, i)
+                                            for i, card_fields in enumerate(embedded_listings)], page_number)
+        
+        # Refresh runs hash raw card HTML first and only parse cards that changed
+        if self.card_index is not None:
+            page_properties = self.changed_card_properties(response.text, page_number)
+            if page_properties is not None:
+                logger.info(f"Successfully processed {len(page_properties)} properties from page {page_number}")
+                return page_properties
+        
+        soup = parse_html(response.text, self.parser)
+        
+        # Try different possible selectors for property containers
+        containers = [
+            soup.find("ul", class_="styles_desktop_containerV85pq"),
+            soup.find("ul", class_=lambda x: x and "container" in x.lower()),
+            soup.find("div", class_=lambda x: x and "property" in x.lower()),
+            soup.find_all("li", attrs={"data-testid": "list-item"}),
+            soup.find_all("li", attrs={"data-id": True}),
+            soup.find_all("article", class_=lambda x: x and "property-card" in x),
+        ]
+        
+        lands = []
+        for i, container in enumerate(containers):
+            if container:
+                if hasattr(container, 'find_all'):
+                    lands = container.find_all("li")
+                elif isinstance(container, list):
+                    lands = container
+                else:
+                    lands = [container]
+                break
+        
+        if not lands:
+            logger.warning(f"No property listings found on page {page_number}")
+            return []
+        
+        logger.info(f"Found {len(lands)} property listings on page {page_number}")
+        
+        page_properties = []
+        
+        for i, land in enumerate(lands):
+            try:
+                card_fields = self.dom_card_fields(land)
+                card_fields["property_id"] = land.get("data-id")
+                page_properties.append(self.build_property_info(card_fields, page_number, i))
+                
+            except Exception as e:
+                logger.error(f"Error processing property {i+1} on page {page_number}: {e}")
+                continue
+        
+        page_properties = self.skip_unchanged(page_properties, page_number)
+        logger.info(f"Successfully processed {len(page_properties)} properties from page {page_number}")
+        return page_properties
+
+    def fetch_page_properties(self, page_url, page_number):
+        """Fetch and parse a single page without touching shared scraper state"""
+        try:
+            return self.fetch_page(page_url, page_number)
         except Exception as e:
             logger.error(f"Error scraping page {page_number}: {e}")
-            return 0
+            self.count_error()
+            return []
+
+    def count_error(self):
+        with self._data_lock:
+            self.error_count += 1
+
+    def report_progress(self, event, **fields):
+        """Publish a progress event with the run's running totals"""
+        if self.progress is None:
+            return
+        rates = self.rate_limiter.current_rates()
+        self.progress.emit(event, listings=self.record_count, detailed=self.detailed_count,
+                           errors=self.error_count, unchanged=self.unchanged_count,
+                           duplicates=self.duplicate_count,
+                           rate=round(max(rates.values()) if rates else self.rate_limiter.initial_rate, 3),
+                           **fields)
+
+    def add_page_properties(self, page_properties):
+        """Number a page's properties globally, keep them and push them to the sink"""
+        with self._data_lock:
+            offset = self.record_count
+            for n, property_info in enumerate(page_properties):
+                property_info['global_property_index'] = offset + n + 1
+            self.record_count += len(page_properties)
+            self.pages_with_records.update(p['page_number'] for p in page_properties)
+            if self.keep_records:
+                self.properties_data.extend(page_properties)
+        
+        if not self.collect_detailed_data:
+            self.emit_records(page_properties)
+            return
+        
+        # Collect detailed property data (optional, can be disabled for faster scraping).
+        # Cards waiting on the pipeline reach the sink once they are enriched.
+        ready = []
+        for property_info in page_properties:
+            if property_info["property_url"] == "N/A":
+                ready.append(property_info)
+            elif self.detail_pipeline:
+                self.submit_for_details(property_info)
+            else:
+                self.apply_detailed_data(property_info, self.collect_property_data(property_info["property_url"]))
+        self.emit_records(ready)
+
+    def drop_repeated_cards(self, page_properties, seen_listings, page_number):
+        """Keep only the first appearance of each property_id in this run"""
+        unique_properties = []
+        repeated = 0
+        fetches_avoided = 0
+        for property_info in page_properties:
+            if seen_listings.add(property_info['property_id']):
+                unique_properties.append(property_info)
+                continue
+            repeated += 1
+            if self.collect_detailed_data and property_info["property_url"] != "N/A":
+                fetches_avoided += 1
+        if repeated:
+            self.duplicate_count += repeated
+            self.detail_fetches_avoided += fetches_avoided
+            logger.info(f"Skipped {repeated} cards already seen earlier in this run on page {page_number}")
+        return unique_properties
+
+    def submit_for_details(self, property_info):
+        with self._data_lock:
+            self.pending_details[property_info['global_property_index']] = property_info
+        self.detail_pipeline.submit(property_info)
+
+    def apply_detailed_data(self, property_info, detailed_data):
+        """Merge enriched detail-page fields into a record and hand it to the sink"""
+        property_info.update(detailed_data)
+        with self._data_lock:
+            if detailed_data:
+                self.detailed_count += 1
+        self.emit_records([property_info])
+        with self._data_lock:
+            self.pending_details.pop(property_info['global_property_index'], None)
+
+    def pending_details_snapshot(self):
+        with self._data_lock:
+            return [dict(record) for record in self.pending_details.values()]
+
+    def emit_records(self, records):
+        card_hashes = [(record["property_id"], record.pop(CARD_HASH_FIELD, None)) for record in records]
+        if self.sink is not None:
+            self.sink.write_batch(records)
+        # Digests are only committed once their records are safely written
+        if self.card_index is not None:
+            self.card_index.update(card_hashes)
+
+    def load_records_frame(self):
+        """Return every scraped record as a DataFrame, from memory or from the sink file"""
+        if self.properties_data:
+            return pd.DataFrame(self.properties_data)
+        if self.sink is not None:
+            return self.sink.read_frame()
+        return pd.DataFrame()
+
+    def scrape_single_page(self, page_url, page_number):
+        """Scrape properties from a single page"""
+        page_properties = self.fetch_page_properties(page_url, page_number)
+        self.add_page_properties(page_properties)
+        return len(page_properties)
 
     def scrape_multiple_pages(self, base_url="https://www.propertyfinder.ae/en/search?c=1&t=5&fu=0&ob=mr", 
-                            start_page=1, max_pages=None, collect_detailed_data=False, auto_detect_end=True):
-        """Scrape property listings from multiple pages with no limits"""
+                            start_page=1, max_pages=None, collect_detailed_data=False, auto_detect_end=True,
+                            concurrency=1, requests_per_second=None, detail_workers=DEFAULT_DETAIL_WORKERS,
+                            checkpoint=None, known_ids=None, stop_after_known_pages=DEFAULT_KNOWN_PAGES_TO_STOP,
+                            stop_event=None):
+        """Scrape property listings from multiple pages with no limits
+        
+        Up to ``concurrency`` pages are fetched at once while every request
+        goes through the per-host rate limiter, which never exceeds
+        ``requests_per_second`` and slows down on 429/5xx responses. Pages are still merged
+        in page order, so the consecutive-empty-pages end check is unchanged.
+        With detailed data enabled, cards are handed to a pool of
+        ``detail_workers`` so pagination never waits on detail pages.
+        
+        If a ``checkpoint`` is given, progress is saved after every merged
+        page; an unfinished checkpoint is resumed from the page after the last
+        completed one, skipping listings that were already written.
+        
+        Passing ``known_ids`` (property_ids from earlier runs) turns on
+        incremental mode: with a most-recent-first sort, pagination stops once
+        ``stop_after_known_pages`` consecutive pages hold only known listings.
+        Those pages are still written so the store refreshes their last_seen.
+        
+        Setting ``stop_event`` (anything with ``is_set()``) ends the run after
+        the page being merged; everything merged so far is written as usual.
+        """
         self.collect_detailed_data = collect_detailed_data
+        if requests_per_second:
+            self.rate_limiter.set_rate(requests_per_second)
+        resize_pool(self.session, self.transport, concurrency + (detail_workers if collect_detailed_data else 0))
+        concurrency = max(1, int(concurrency))
         total_properties = 0
         consecutive_empty_pages = 0
         max_consecutive_empty = 3  # Stop after 3 consecutive empty pages
+        consecutive_known_pages = 0
+        stopped = False
+        # Exact for bounded runs; unlimited runs use a Bloom filter so memory stays flat
+        seen_listings = SeenSet(exact=max_pages is not None)
+        first_page = start_page
+        already_seen_ids = set()
+        pending_from_checkpoint = []
+        
+        if checkpoint is not None and checkpoint.last_completed_page is not None and not checkpoint.finished:
+            first_page = checkpoint.last_completed_page + 1
+            consecutive_empty_pages = checkpoint.consecutive_empty_pages
+            self.record_count = checkpoint.record_count
+            already_seen_ids = checkpoint.seen_ids
+            pending_from_checkpoint = checkpoint.pending_details
+            logger.info(f"♻️ Resuming from checkpoint: pages {start_page}-{checkpoint.last_completed_page} already done, "
+                        f"{len(already_seen_ids)} listings seen, {len(pending_from_checkpoint)} detail pages pending")
+        elif checkpoint is not None:
+            checkpoint.start(
+                base_url=base_url, start_page=start_page, max_pages=max_pages,
+                collect_detailed_data=collect_detailed_data, auto_detect_end=auto_detect_end,
+                records_file=self.sink.path if self.sink is not None else None,
+                incremental=known_ids is not None, parser=self.parser, streaming=self.streaming,
+            )
         
         if max_pages is None:
             logger.info(f"Starting unlimited multi-page scraping from page {start_page}")
@@ -208,58 +546,212 @@ class PropertyScraper:
         
         logger.info(f"Detailed data collection: {'Enabled' if collect_detailed_data else 'Disabled'}")
         logger.info(f"Auto-detect end: {'Enabled' if auto_detect_end else 'Disabled'}")
+        if known_ids is not None:
+            logger.info(f"Incremental mode: {len(known_ids)} known listings, "
+                        f"stopping after {stop_after_known_pages} consecutive pages of them")
+        logger.info(f"Concurrency: {concurrency} pages in flight, "
+                    f"at most {self.rate_limiter.initial_rate:.2f} requests/second per host")
         
-        page_num = start_page
+        self.report_progress("start", base_url=base_url, start_page=first_page, max_pages=max_pages)
         
-        while True:
-            # Check if we've reached max_pages (if specified)
-            if max_pages is not None and (page_num - start_page) >= max_pages:
-                logger.info(f"Reached maximum page limit: {max_pages}")
-                break
+        if collect_detailed_data:
+            self.detail_pipeline = DetailEnrichmentPipeline(
+                self.collect_property_data, detail_workers, on_result=self.apply_detailed_data).start()
+            for property_info in pending_from_checkpoint:
+                self.submit_for_details(property_info)
+        else:
+            self.emit_records(pending_from_checkpoint)
+        
+        next_page = first_page
+        last_page = first_page - 1
+        in_flight = {}  # page number -> future, merged strictly in page order
+        stop_submitting = False
+        
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            while True:
+                if stop_event is not None and stop_event.is_set():
+                    logger.info(f"⏹️ Stop requested, ending the run after page {last_page}")
+                    stopped = True
+                    for future in in_flight.values():
+                        future.cancel()
+                    in_flight.clear()
+                    break
                 
-            try:
-                # Construct page URL
-                page_url = f"{base_url}&page={page_num}"
+                # Keep the window full until the end of the range is known
+                while not stop_submitting and len(in_flight) < concurrency:
+                    if max_pages is not None and (next_page - start_page) >= max_pages:
+                        logger.info(f"Reached maximum page limit: {max_pages}")
+                        stop_submitting = True
+                        break
+                    page_url = f"{base_url}&page={next_page}"
+                    in_flight[next_page] = executor.submit(self.fetch_page_properties, page_url, next_page)
+                    next_page += 1
                 
-                # Scrape the page
-                properties_count = self.scrape_single_page(page_url, page_num)
+                if not in_flight:
+                    break
+                
+                page_num = min(in_flight)
+                try:
+                    page_properties = in_flight.pop(page_num).result()
+                except Exception as e:
+                    logger.error(f"Error processing page {page_num}: {e}")
+                    self.count_error()
+                    page_properties = []
+                last_page = page_num
                 
-                if properties_count == 0:
+                # Cards skipped as unchanged still count as listings on the page
+                with self._data_lock:
+                    unchanged_ids = self.unchanged_by_page.pop(page_num, [])
+                if unchanged_ids:
+                    self.unchanged_count += len(unchanged_ids)
+                    if self.sink is not None:
+                        self.sink.mark_seen(unchanged_ids)
+                
+                # Listings written before a restart are not emitted twice
+                if already_seen_ids and page_properties:
+                    fresh_properties = [p for p in page_properties if str(p['property_id']) not in already_seen_ids]
+                    if len(fresh_properties) < len(page_properties):
+                        logger.info(f"Skipped {len(page_properties) - len(fresh_properties)} listings already saved before the restart")
+                    listings_found = True
+                    page_properties = fresh_properties
+                else:
+                    listings_found = bool(page_properties) or bool(unchanged_ids)
+                
+                # Featured and premium cards repeat on many pages; drop them before detail enrichment
+                if page_properties:
+                    page_properties = self.drop_repeated_cards(page_properties, seen_listings, page_num)
+                
+                if not listings_found:
                     consecutive_empty_pages += 1
                     logger.warning(f"No properties found on page {page_num}. Empty pages count: {consecutive_empty_pages}")
                     
                     if auto_detect_end and consecutive_empty_pages >= max_consecutive_empty:
                         logger.info(f"Stopping after {consecutive_empty_pages} consecutive empty pages")
+                        # Pages past the end are discarded, whether or not they already ran
+                        for future in in_flight.values():
+                            future.cancel()
+                        in_flight.clear()
                         break
                 else:
                     consecutive_empty_pages = 0  # Reset counter
-                    total_properties += properties_count
+                    self.add_page_properties(page_properties)
+                    total_properties += len(page_properties)
                 
-                # Progress update every 10 pages
-                if page_num % 10 == 0:
-                    logger.info(f"📊 Progress: Page {page_num} completed. Total properties: {total_properties}")
+                if checkpoint is not None:
+                    checkpoint.page_completed(page_num, page_properties, consecutive_empty_pages,
+                                              self.record_count, self.pending_details_snapshot())
                 
-                # Add delay between pages to be respectful
-                logger.info(f"Waiting 1.5 seconds before next page...")
-                time.sleep(1.5)
+                if known_ids is not None and listings_found:
+                    new_on_page = sum(str(p['property_id']) not in known_ids for p in page_properties)
+                    self.new_listing_count += new_on_page
+                    if not new_on_page:
+                        consecutive_known_pages += 1
+                        logger.info(f"Page {page_num} holds only known listings ({consecutive_known_pages}/{stop_after_known_pages})")
+                    else:
+                        consecutive_known_pages = 0
+                    if consecutive_known_pages >= stop_after_known_pages:
+                        logger.info(f"⏩ Caught up with earlier runs after page {page_num}, stopping incremental scrape")
+                        for future in in_flight.values():
+                            future.cancel()
+                        in_flight.clear()
+                        break
                 
-                page_num += 1
+                self.report_progress("page", page=page_num, pages_done=page_num - first_page + 1)
                 
-            except Exception as e:
-                logger.error(f"Error processing page {page_num}: {e}")
-                page_num += 1
-                continue
+                # Progress update every 10 pages
+                if page_num % 10 == 0:
+                    logger.info(f"📊 Progress: Page {page_num} completed. Total properties: {total_properties}")
+        
+        if self.detail_pipeline:
+            logger.info(f"Waiting for {self.detail_pipeline.tasks.unfinished_tasks} queued detail pages...")
+            self.detail_pipeline.close()
+            self.detail_pipeline = None
+            logger.info(f"Merged detailed data into {self.detailed_count} properties")
+        
+        if self.duplicate_count:
+            logger.info(f"🔁 Skipped {self.duplicate_count} repeated cards "
+                        f"({self.detail_fetches_avoided} detail page fetches avoided)")
         
-        pages_scraped = page_num - start_page
+        if self.card_index is not None:
+            self.card_index.save()
+            logger.info(f"Skipped {self.unchanged_count} unchanged cards; card index holds {len(self.card_index)} listings")
+        
+        if checkpoint is not None and not stopped:
+            checkpoint.mark_finished(self.pending_details_snapshot())
+        elif checkpoint is not None:
+            # The drained pipeline wrote the cards the last page save still lists as pending
+            checkpoint.pending_saved(self.pending_details_snapshot())
+            logger.info(f"♻️ Checkpoint kept at {checkpoint.path}; resume to carry on after page {last_page}")
+        
+        pages_scraped = last_page - first_page + 1
+        for host, rate in self.rate_limiter.current_rates().items():
+            logger.info(f"Final request rate for {host}: {rate:.2f} requests/second")
+        stats = connection_stats(self.session)
+        logger.info(f"Connections: {stats['requests']} requests over {stats['connections_opened']} connections "
+                    f"({stats['reuse_ratio']:.0%} keep-alive reuse)")
+        if self.cache is not None:
+            cache_stats = self.cache.stats()
+            logger.info(f"HTTP cache: {cache_stats['hits']} fresh hits, {cache_stats['revalidated']} revalidated (304), "
+                        f"{cache_stats['misses']} fetched, {cache_stats['stored_mb']:.1f} MB stored")
+        self.report_progress("finish", pages_done=pages_scraped, first_page=first_page, last_page=last_page)
         logger.info(f"✅ Multi-page scraping completed!")
         logger.info(f"📊 Total properties scraped: {total_properties} from {pages_scraped} pages")
-        logger.info(f"📄 Page range: {start_page} to {page_num - 1}")
+        logger.info(f"📄 Page range: {first_page} to {last_page}")
         
         return self.properties_data
 
+    def export_frame(self):
+        """Records in the column order used by every export, extra columns last"""
+        df = self.load_records_frame()
+        if df.empty:
+            return df
+        
+        # Enriched cards reach the sink as their detail pages finish; export in listing order
+        if 'global_property_index' in df.columns:
+            df = df.sort_values('global_property_index', kind='stable', ignore_index=True)
+        
+        # Reorder columns for better readability
+        preferred_columns = list(PREFERRED_COLUMNS)
+        
+        # Add detailed data columns if they exist
+        if 'detailed_title' in df.columns:
+            preferred_columns.extend(DETAILED_COLUMNS)
+        
+        # Reorder columns, keeping any extra columns at the end
+        existing_columns = [col for col in preferred_columns if col in df.columns]
+        extra_columns = [col for col in df.columns if col not in preferred_columns]
+        return df[existing_columns + extra_columns]
+    
+    def save_to_parquet(self, filename=None):
+        """Save scraped property data as typed Parquet (numeric price/area, categorical text)"""
+        df = self.export_frame()
+        if df.empty:
+            logger.warning("No property data to save")
+            return None
+        
+        if filename is None:
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            filename = f"property_data_{timestamp}.parquet"
+        
+        try:
+            write_parquet(df, filename)
+            logger.info(f"Typed property data saved to: {filename}")
+            return filename
+        except ImportError:
+            logger.warning("pyarrow is not installed, skipping the Parquet export")
+            return None
+        except Exception as e:
+            logger.error(f"Error saving to Parquet: {e}")
+            return None
+    
     def save_to_excel(self, filename=None):
-        """Save scraped property data to Excel file"""
-        if not self.properties_data:
+        """Save scraped property data to Excel file
+        
+        Records kept in memory are used when present; otherwise the sink's
+        file is read back, making the workbook an optional final export.
+        """
+        df = self.export_frame()
+        if df.empty:
             logger.warning("No property data to save")
             return None
         
@@ -268,77 +760,33 @@ class PropertyScraper:
             filename = f"property_data_{timestamp}.xlsx"
         
         try:
-            # Create DataFrame
-            df = pd.DataFrame(self.properties_data)
-            
-            # Reorder columns for better readability
-            preferred_columns = [
-                'scrape_date', 'page_number', 'property_index_on_page', 'global_property_index', 
-                'property_id', 'title', 'property_type', 'price', 'location', 'area', 
-                'bedrooms', 'bathrooms', 'listing_status', 'is_new', 'listed_time', 
-                'phone', 'property_url', 'listing_image_count'
-            ]
-            
-            # Add detailed data columns if they exist
-            if 'detailed_title' in df.columns:
-                preferred_columns.extend([
-                    'detailed_title', 'detailed_location', 'detailed_price', 
-                    'description', 'detailed_image_count'
-                ])
-            
-            # Reorder columns, keeping any extra columns at the end
-            existing_columns = [col for col in preferred_columns if col in df.columns]
-            extra_columns = [col for col in df.columns if col not in preferred_columns]
-            final_columns = existing_columns + extra_columns
-            df = df[final_columns]
+            # Summary sheet
+            summary_data = {
+                'Metric': [
+                    'Total Properties Scraped',
+                    'Total Pages Scraped',
+                    'Properties with Detailed Data',
+                    'Properties with Images',
+                    'Most Common Property Type',
+                    'Most Common Location',
+                    'Scrape Date'
+                ],
+                'Value': [
+                    len(df),
+                    df['page_number'].nunique() if 'page_number' in df.columns else 1,
+                    len(df[df['detailed_title'].notna()]) if 'detailed_title' in df.columns else 0,
+                    len(df[df['listing_image_count'] != 'N/A']),
+                    df['property_type'].mode().iloc[0] if not df['property_type'].mode().empty else 'N/A',
+                    df['location'].mode().iloc[0] if not df['location'].mode().empty else 'N/A',
+                    datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                ]
+            }
+            summary_df = pd.DataFrame(summary_data)
             
-            # Save to Excel with formatting
-            with pd.ExcelWriter(filename, engine='openpyxl') as writer:
-                # Main data sheet
-                df.to_excel(writer, sheet_name='Property_Data', index=False)
-                
-                # Summary sheet
-                summary_data = {
-                    'Metric': [
-                        'Total Properties Scraped',
-                        'Total Pages Scraped',
-                        'Properties with Detailed Data',
-                        'Properties with Images',
-                        'Most Common Property Type',
-                        'Most Common Location',
-                        'Scrape Date'
-                    ],
-                    'Value': [
-                        len(df),
-                        df['page_number'].nunique() if 'page_number' in df.columns else 1,
-                        len(df[df['detailed_title'].notna()]) if 'detailed_title' in df.columns else 0,
-                        len(df[df['listing_image_count'] != 'N/A']),
-                        df['property_type'].mode().iloc[0] if not df['property_type'].mode().empty else 'N/A',
-                        df['location'].mode().iloc[0] if not df['location'].mode().empty else 'N/A',
-                        datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                    ]
-                }
-                
-                summary_df = pd.DataFrame(summary_data)
-                summary_df.to_excel(writer, sheet_name='Summary', index=False)
-                
-                # Format the main sheet
-                worksheet = writer.sheets['Property_Data']
-                
-                # Auto-adjust column widths
-                for column in worksheet.columns:
-                    max_length = 0
-                    column_letter = column[0].column_letter
-                    
-                    for cell in column:
-                        try:
-                            if len(str(cell.value)) > max_length:
-                                max_length = len(str(cell.value))
-                        except:
-                            pass
-                    
-                    adjusted_width = min(max_length + 2, 50)  # Cap at 50 characters
-                    worksheet.column_dimensions[column_letter].width = adjusted_width
+            # Main data sheet is streamed row by row with widths sized from the frame
+            engine = write_workbook(filename, {'Property_Data': df, 'Summary': summary_df},
+                                    sized_sheets=['Property_Data'])
+            logger.info(f"Workbook written with {engine}")
             
             logger.info(f"Property data saved to: {filename}")
             logger.info(f"Total properties saved: {len(df)}")
@@ -348,9 +796,180 @@ class PropertyScraper:
             logger.error(f"Error saving to Excel: {e}")
             return None
 
-def main():
+def open_run_sink(records_file, append=False, store_path=DEFAULT_STORE_PATH):
+    """This run's JSONL records, mirrored into the listing store shared by every run"""
+    columns = PREFERRED_COLUMNS + DETAILED_COLUMNS
+    return MultiSink(open_sink(records_file, columns, append=append), ListingStore(store_path, columns))
+
+# Every key a job spec may set, with its default; see run_job()
+DEFAULT_JOB = {
+    "base_url": "https://www.propertyfinder.ae/en/search?c=1&t=5&fu=0&ob=mr",
+    "start_page": 1,
+    "max_pages": 5,  # None for unlimited
+    "detailed": False,
+    "auto_detect_end": True,
+    "incremental": False,  # Stop at already-stored listings and skip unchanged cards
+    "concurrency": DEFAULT_CONCURRENCY,
+    "requests_per_second": DEFAULT_REQUESTS_PER_SECOND,
+    "parser": DEFAULT_PARSER,  # One of parsing.PARSER_BACKENDS
+    "streaming": False,  # Parse pages incrementally instead of building whole trees
+    "records_file": None,  # Defaults to property_data_<timestamp>.jsonl
+    "store_path": DEFAULT_STORE_PATH,
+    "checkpoint_path": DEFAULT_CHECKPOINT_PATH,  # None to run without a checkpoint
+    "progress_file": None,  # JSONL progress events, see progress.py
+    "log_file": None,  # Copy of this job's log lines
+}
+
+# The menu options of main() as job specs
+JOB_PRESETS = {
+    "1": {"max_pages": 3},
+    "2": {"max_pages": 5},
+    "3": {"max_pages": 10},
+    "4": {"max_pages": None},
+    "5": {"max_pages": None, "detailed": True},
+    "7": {"max_pages": None, "incremental": True},
+}
+
+def job_config(config=None, preset=None):
+    """Fill a job spec in from DEFAULT_JOB and an optional menu preset; unknown keys are an error"""
+    job = dict(DEFAULT_JOB)
+    if preset is not None:
+        if preset not in JOB_PRESETS:
+            raise ValueError(f"Unknown preset {preset!r}; use one of {', '.join(JOB_PRESETS)}")
+        job.update(JOB_PRESETS[preset])
+    job.update(config or {})
+    unknown = set(job) - set(DEFAULT_JOB)
+    if unknown:
+        raise ValueError(f"Unknown job settings: {', '.join(sorted(unknown))}")
+    return job
+
+def run_job(config, stop_event=None):
+    """Run one scrape from a plain-dict job spec and return a summary dict
+    
+    Nothing is asked on stdin, so this is what the CLI, the dashboard and
+    schedulers call. ``config`` takes the keys of DEFAULT_JOB; missing ones
+    use their defaults. ``stop_event`` ends the run early with everything
+    scraped so far saved.
+    """
+    job = job_config(config)
+    started_at = datetime.now()
+    log_handler = None
+    if job["log_file"]:
+        log_handler = logging.FileHandler(job["log_file"], encoding="utf-8")
+        log_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+        logging.getLogger().addHandler(log_handler)
+    progress = ProgressReporter(job["progress_file"]) if job["progress_file"] else None
+    cache = None
+    
+    try:
+        known_ids = load_known_ids(job["store_path"]) if job["incremental"] else None
+        records_file = job["records_file"] or f"property_data_{started_at.strftime('%Y%m%d_%H%M%S')}.jsonl"
+        sink = open_run_sink(records_file, store_path=job["store_path"])
+        card_index = CardHashIndex(DEFAULT_CARD_INDEX_PATH) if job["incremental"] else None
+        # Pool workers run many jobs, so the cache connection is closed with the job
+        cache = HttpCache()
+        scraper = PropertyScraper(parser=job["parser"], streaming=job["streaming"], sink=sink,
+                                  keep_records=job["max_pages"] is not None, cache=cache,
+                                  card_index=card_index, progress=progress)
+        logger.info(f"💾 Job streaming records to {records_file}, listing store {job['store_path']}")
+        
+        with sink:
+            scraper.scrape_multiple_pages(
+                base_url=job["base_url"],
+                start_page=job["start_page"],
+                max_pages=job["max_pages"],
+                collect_detailed_data=job["detailed"],
+                auto_detect_end=job["auto_detect_end"],
+                concurrency=job["concurrency"],
+                requests_per_second=job["requests_per_second"],
+                checkpoint=ScrapeCheckpoint(job["checkpoint_path"]) if job["checkpoint_path"] else None,
+                known_ids=known_ids,
+                stop_event=stop_event
+            )
+        
+        excel_file = parquet_file = None
+        if scraper.record_count:
+            # Save to Excel, plus a typed Parquet copy for analysis; named after the
+            # records file so concurrent jobs never write to the same workbook
+            export_stem = os.path.splitext(records_file)[0]
+            excel_file = scraper.save_to_excel(f"{export_stem}.xlsx")
+            parquet_file = scraper.save_to_parquet(f"{export_stem}.parquet")
+        finished_at = datetime.now()
+        return {
+            "records_file": records_file,
+            "excel_file": excel_file,
+            "parquet_file": parquet_file,
+            "listings": scraper.record_count,
+            "pages": len(scraper.pages_with_records),
+            "detailed": scraper.detailed_count,
+            "duplicates": scraper.duplicate_count,
+            "detail_fetches_avoided": scraper.detail_fetches_avoided,
+            "new_listings": scraper.new_listing_count if job["incremental"] else None,
+            "unchanged": scraper.unchanged_count,
+            "errors": scraper.error_count,
+            "stopped": bool(stop_event is not None and stop_event.is_set()),
+            "started_at": started_at.strftime('%Y-%m-%d %H:%M:%S'),
+            "finished_at": finished_at.strftime('%Y-%m-%d %H:%M:%S'),
+            "duration_seconds": (finished_at - started_at).total_seconds(),
+        }
+    finally:
+        if cache is not None:
+            cache.close()
+        if progress is not None:
+            progress.close()
+        if log_handler is not None:
+            logging.getLogger().removeHandler(log_handler)
+            log_handler.close()
+
+def resume_scrape(checkpoint_path=DEFAULT_CHECKPOINT_PATH):
+    """Pick up an interrupted run exactly where its checkpoint left off"""
+    checkpoint = ScrapeCheckpoint.load(checkpoint_path)
+    if checkpoint is None:
+        print(f"❌ No checkpoint found at {checkpoint_path}")
+        return None
+    if checkpoint.finished:
+        print(f"✅ The checkpointed run already finished ({checkpoint.updated_at}); nothing to resume")
+        return None
+    
+    config = checkpoint.config
+    records_file = config.get("records_file") or f"property_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+    sink = open_run_sink(records_file, append=True)
+    card_index = CardHashIndex(DEFAULT_CARD_INDEX_PATH) if config.get("incremental") else None
+    scraper = PropertyScraper(parser=config.get("parser", DEFAULT_PARSER), streaming=config.get("streaming", False),
+                              sink=sink, keep_records=False, cache=HttpCache(), card_index=card_index)
+    
+    print(f"♻️ Resuming scrape after page {checkpoint.last_completed_page} (checkpoint saved {checkpoint.updated_at})")
+    print(f"💾 Appending records to: {records_file}")
+    print(f"🗄️ Listing store: {DEFAULT_STORE_PATH}")
+    
+    with sink:
+        scraper.scrape_multiple_pages(
+            base_url=config["base_url"],
+            start_page=config["start_page"],
+            max_pages=config["max_pages"],
+            collect_detailed_data=config["collect_detailed_data"],
+            auto_detect_end=config["auto_detect_end"],
+            concurrency=DEFAULT_CONCURRENCY,
+            requests_per_second=DEFAULT_REQUESTS_PER_SECOND,
+            checkpoint=checkpoint,
+            known_ids=load_known_ids(DEFAULT_STORE_PATH) if config.get("incremental") else None
+        )
+    
+    if scraper.record_count:
+        excel_file = scraper.save_to_excel()
+        parquet_file = scraper.save_to_parquet()
+        print(f"✅ Run complete: {scraper.record_count} properties in total, saved to {excel_file}")
+        if parquet_file:
+            print(f"📦 Typed columnar copy: {parquet_file}")
+        return excel_file
+    print("❌ No properties scraped")
+    return None
+
+def main(resume=False):
     """Main function to run the scraper"""
-    scraper = PropertyScraper()
+    if resume:
+        resume_scrape()
+        return
     
     print("🏠 Property Finder Multi-Page Scraper (UNLIMITED)")
     print("=" * 60)
@@ -363,14 +982,16 @@ def main():
     print("4. UNLIMITED scrape (all pages, no detailed data)")
     print("5. UNLIMITED with detailed data (WARNING: VERY SLOW)")
     print("6. Custom configuration")
+    print("7. Incremental refresh (newest pages until already-stored listings are reached)")
     
-    choice = input("\nSelect option (1-6): ").strip()
+    choice = input("\nSelect option (1-7): ").strip()
     
     # Default values
     start_page = 1
     max_pages = None
     collect_detailed = False
     auto_detect_end = True
+    known_ids = None
     base_url = "https://www.propertyfinder.ae/en/search?c=1&t=5&fu=0&ob=mr"
     
     if choice == "1":
@@ -421,6 +1042,12 @@ def main():
                     
         except ValueError:
             print("Invalid input, using defaults")
+    elif choice == "7":
+        max_pages = None
+        known_ids = load_known_ids(DEFAULT_STORE_PATH)
+        print(f"✅ Incremental refresh selected: {len(known_ids)} listings already in {DEFAULT_STORE_PATH}")
+        if not known_ids:
+            print("⚠️  The listing store is empty, so this first run walks every page")
     else:
         max_pages = 5
         print("Invalid choice, using defaults: 5 pages")
@@ -430,82 +1057,195 @@ def main():
     print(f"   📊 Detailed data: {'Enabled' if collect_detailed else 'Disabled'}")
     print(f"   🔍 Auto-detect end: {'Enabled' if auto_detect_end else 'Disabled'}")
     print(f"   🔗 Base URL: {base_url}")
+    print(f"   🧵 Concurrency: {DEFAULT_CONCURRENCY} pages in flight at up to {DEFAULT_REQUESTS_PER_SECOND:g} requests/second")
     
-    if max_pages is None:
+    if known_ids is not None:
+        print(f"   ⏩ Mode: INCREMENTAL - Stops after {DEFAULT_KNOWN_PAGES_TO_STOP} consecutive pages of known listings")
+    elif max_pages is None:
         print(f"   ⚡ Mode: UNLIMITED - Will scrape until no more properties found")
-        estimated_time = "Several hours" if collect_detailed else "30-60 minutes"
+        estimated_time = "Several hours" if collect_detailed else "A few minutes"
         print(f"   ⏱️  Estimated time: {estimated_time}")
     
     # Confirmation for large scrapes
-    if max_pages is None or (max_pages and max_pages > 20):
+    if (max_pages is None and not known_ids) or (max_pages and max_pages > 20):
         confirm = input(f"\n⚠️  Large scrape detected. Continue? (y/n): ").lower().strip()
         if confirm != 'y':
             print("Operation cancelled")
             return
     
-    # Start scraping
-    start_time = datetime.now()
-    print(f"\n🎯 Scraping started at: {start_time.strftime('%Y-%m-%d %H:%M:%S')}")
-    
-    properties = scraper.scrape_multiple_pages(
-        base_url=base_url,
-        start_page=start_page, 
-        max_pages=max_pages,
-        collect_detailed_data=collect_detailed,
-        auto_detect_end=auto_detect_end
-    )
-    end_time = datetime.now()
+    # Every page is flushed to a JSONL file as it completes; unlimited runs
+    # keep nothing in memory and export the workbook from that file at the end
+    records_file = f"property_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+    print(f"   💾 Streaming records to: {records_file}")
+    print(f"   🗄️ Listing store: {DEFAULT_STORE_PATH} (upserted by property_id with price history)")
+    print(f"   ♻️ Progress checkpoint: {DEFAULT_CHECKPOINT_PATH} (rerun with --resume after an interruption)")
     
-    if properties:
-        # Save to Excel
-        excel_file = scraper.save_to_excel()
-        
-        if excel_file:
-            duration = (end_time - start_time).total_seconds()
+    # Start scraping
+    print(f"\n🎯 Scraping started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    result = run_job({
+        "base_url": base_url,
+        "start_page": start_page,
+        "max_pages": max_pages,
+        "detailed": collect_detailed,
+        "auto_detect_end": auto_detect_end,
+        # Refresh runs also skip cards that are byte-for-byte unchanged since they were last written
+        "incremental": known_ids is not None,
+        "records_file": records_file,
+    })
+    print_job_summary(result)
+
+def print_job_summary(result):
+    """Console report for a finished run_job() result"""
+    total_scraped = result["listings"]
+    if total_scraped:
+        if result["excel_file"]:
+            duration = result["duration_seconds"]
             duration_formatted = f"{duration//3600:.0f}h {(duration%3600)//60:.0f}m {duration%60:.0f}s" if duration > 3600 else f"{duration//60:.0f}m {duration%60:.0f}s"
             
-            print(f"\n🎉 SUCCESS!")
-            print(f"📊 {len(properties)} properties scraped in {duration_formatted}")
-            print(f"📁 Data saved to: {excel_file}")
+            print(f"\n🎉 SUCCESS!" if not result["stopped"] else "\n⏹️ STOPPED - partial data saved")
+            print(f"📊 {total_scraped} properties scraped in {duration_formatted}")
+            print(f"📁 Data saved to: {result['excel_file']}")
             print(f"💾 Excel file contains comprehensive property information")
+            if result["parquet_file"]:
+                print(f"📦 Typed columnar copy: {result['parquet_file']}")
             
             # Additional statistics
-            if 'page_number' in scraper.properties_data[0]:
-                pages_scraped = len(set(prop['page_number'] for prop in scraper.properties_data))
-                avg_per_page = len(properties) / pages_scraped if pages_scraped > 0 else 0
-                print(f"📈 Statistics:")
-                print(f"   • Pages scraped: {pages_scraped}")
-                print(f"   • Average properties per page: {avg_per_page:.1f}")
-                print(f"   • Properties with detailed data: {sum(1 for p in properties if p.get('detailed_title', 'N/A') != 'N/A')}")
+            pages_scraped = result["pages"]
+            avg_per_page = total_scraped / pages_scraped if pages_scraped > 0 else 0
+            print(f"📈 Statistics:")
+            print(f"   • Pages scraped: {pages_scraped}")
+            print(f"   • Average properties per page: {avg_per_page:.1f}")
+            print(f"   • Properties with detailed data: {result['detailed']}")
+            print(f"   • Repeated featured/premium cards skipped: {result['duplicates']} "
+                  f"({result['detail_fetches_avoided']} detail fetches avoided)")
+            if result["new_listings"] is not None:
+                print(f"   • New listings since the last run: {result['new_listings']}")
+                print(f"   • Unchanged cards skipped: {result['unchanged']}")
         else:
             print("❌ Failed to save Excel file")
+    elif result["unchanged"]:
+        print(f"✅ Nothing changed: all {result['unchanged']} listings seen match the last run")
     else:
         print("❌ No properties were scraped")
 
-def unlimited_scrape(start_page=1, with_detailed_data=False):
+def unlimited_scrape(start_page=1, with_detailed_data=False, resume=False, checkpoint_path=DEFAULT_CHECKPOINT_PATH):
     """Quick function for unlimited scraping"""
-    scraper = PropertyScraper()
+    if resume:
+        return resume_scrape(checkpoint_path)
+    
+    records_file = f"property_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+    sink = open_run_sink(records_file)
+    scraper = PropertyScraper(sink=sink, keep_records=False, cache=HttpCache())
     base_url = "https://www.propertyfinder.ae/en/search?c=1&t=5&fu=0&ob=mr"
     
     print(f"🚀 Starting unlimited scrape from page {start_page}")
     print(f"📊 Detailed data: {'Enabled' if with_detailed_data else 'Disabled'}")
+    print(f"💾 Streaming records to: {records_file}")
+    print(f"🗄️ Listing store: {DEFAULT_STORE_PATH}")
     
-    properties = scraper.scrape_multiple_pages(
-        base_url=base_url,
-        start_page=start_page,
-        max_pages=None,  # Unlimited
-        collect_detailed_data=with_detailed_data,
-        auto_detect_end=True
-    )
+    with sink:
+        scraper.scrape_multiple_pages(
+            base_url=base_url,
+            start_page=start_page,
+            max_pages=None,  # Unlimited
+            collect_detailed_data=with_detailed_data,
+            auto_detect_end=True,
+            concurrency=DEFAULT_CONCURRENCY,
+            requests_per_second=DEFAULT_REQUESTS_PER_SECOND,
+            checkpoint=ScrapeCheckpoint(checkpoint_path)
+        )
     
-    if properties:
+    if scraper.record_count:
         excel_file = scraper.save_to_excel()
-        print(f"✅ Scraped {len(properties)} properties and saved to {excel_file}")
+        parquet_file = scraper.save_to_parquet()
+        print(f"✅ Scraped {scraper.record_count} properties and saved to {excel_file}")
+        if parquet_file:
+            print(f"📦 Typed columnar copy: {parquet_file}")
         return excel_file
     else:
         print("❌ No properties scraped")
         return None
 
+def incremental_scrape(base_url="https://www.propertyfinder.ae/en/search?c=1&t=5&fu=0&ob=mr",
+                       stop_after_known_pages=DEFAULT_KNOWN_PAGES_TO_STOP, store_path=DEFAULT_STORE_PATH,
+                       card_index_path=DEFAULT_CARD_INDEX_PATH):
+    """Refresh the listing store with only the listings added or changed since the last run
+    
+    The URL must sort most recent first (``ob=mr``) for the early stop to be safe.
+    Cards whose hash matches the card index are neither parsed nor written.
+    """
+    known_ids = load_known_ids(store_path)
+    records_file = f"property_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+    sink = open_run_sink(records_file, store_path=store_path)
+    scraper = PropertyScraper(sink=sink, keep_records=False, cache=HttpCache(),
+                              card_index=CardHashIndex(card_index_path))
+    
+    print(f"⏩ Incremental scrape against {len(known_ids)} listings in {store_path}")
+    print(f"💾 Streaming records to: {records_file}")
+    
+    with sink:
+        scraper.scrape_multiple_pages(
+            base_url=base_url,
+            max_pages=None,
+            auto_detect_end=True,
+            concurrency=DEFAULT_CONCURRENCY,
+            requests_per_second=DEFAULT_REQUESTS_PER_SECOND,
+            known_ids=known_ids,
+            stop_after_known_pages=stop_after_known_pages
+        )
+    
+    print(f"✅ Incremental scrape wrote {scraper.record_count} listings ({scraper.new_listing_count} new), "
+          f"skipped {scraper.unchanged_count} unchanged cards")
+    return records_file if scraper.record_count else None
+
+def cli(argv=None):
+    """Non-interactive entry point: ``python main.py --preset 4`` or ``python main.py --job job.json``"""
+    import argparse
+    import json
+    
+    parser = argparse.ArgumentParser(description="Run a Property Finder scrape without prompts")
+    parser.add_argument("--job", help="JSON job spec file (keys of DEFAULT_JOB), '-' for stdin")
+    parser.add_argument("--preset", choices=sorted(JOB_PRESETS), help="one of the interactive menu options")
+    parser.add_argument("--base-url")
+    parser.add_argument("--start-page", type=int)
+    parser.add_argument("--max-pages", type=int, help="0 for unlimited")
+    parser.add_argument("--detailed", action="store_true", default=None)
+    parser.add_argument("--no-auto-detect", dest="auto_detect_end", action="store_false", default=None)
+    parser.add_argument("--incremental", action="store_true", default=None)
+    parser.add_argument("--concurrency", type=int)
+    parser.add_argument("--rps", dest="requests_per_second", type=float,
+                        help="request rate ceiling per host; backoff on 429/5xx may go lower")
+    parser.add_argument("--parser", choices=PARSER_BACKENDS, help="HTML parser backend")
+    parser.add_argument("--streaming", action="store_true", default=None,
+                        help="parse pages as they download instead of building whole trees")
+    parser.add_argument("--records-file")
+    parser.add_argument("--progress-file")
+    parser.add_argument("--log-file")
+    parser.add_argument("--resume", action="store_true", help="continue the run in the checkpoint")
+    args = parser.parse_args(argv)
+    
+    if args.resume:
+        return 0 if resume_scrape() else 1
+    
+    config = {}
+    if args.job:
+        with (sys.stdin if args.job == "-" else open(args.job, encoding="utf-8")) as f:
+            config = json.load(f)
+    overrides = {key: value for key, value in vars(args).items()
+                 if key in DEFAULT_JOB and value is not None}
+    if overrides.get("max_pages") == 0:
+        overrides["max_pages"] = None
+    config.update(overrides)
+    try:
+        job_config(config, args.preset)
+    except ValueError as e:
+        parser.error(str(e))
+    
+    result = run_job(job_config(config, args.preset))
+    print_job_summary(result)
+    print(json.dumps(result))
+    return 0 if result["listings"] or result["unchanged"] else 1
+
 if __name__ == "__main__":
     # Install required packages if not already installed
     try:
@@ -517,7 +1257,9 @@ if __name__ == "__main__":
         import pandas as pd
         import openpyxl
     
-    main()
+    if len(sys.argv) > 1 and sys.argv[1:] != ["--resume"]:
+        sys.exit(cli(sys.argv[1:]))
+    main(resume="--resume" in sys.argv[1:])
 
 # Example usage for programmatic access:
 # 
@@ -527,6 +1269,9 @@ if __name__ == "__main__":
 # # Unlimited scrape starting from page 100
 # unlimited_scrape(start_page=100, with_detailed_data=False)
 # 
+# # Continue an interrupted run from its checkpoint (same as `python main.py --resume`)
+# unlimited_scrape(resume=True)
+# 
 # # Custom unlimited scrape with detailed data
 # scraper = PropertyScraper()
 # properties = scraper.scrape_multiple_pages(
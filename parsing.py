@@ -0,0 +1,107 @@
+import logging
+from collections.abc import Callable
+
+from bs4 import BeautifulSoup
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PARSER = "html.parser"
+PARSER_BACKENDS = ("html.parser", "lxml", "selectolax")
+
+
+def resolve_parser(backend):
+    """Return ``backend`` if it can be used here, otherwise fall back to html.parser"""
+    if backend not in PARSER_BACKENDS:
+        raise ValueError(f"Unknown parser backend {backend!r}; choose one of {', '.join(PARSER_BACKENDS)}")
+    try:
+        if backend == "lxml":
+            import lxml  # noqa: F401
+        elif backend == "selectolax":
+            import selectolax.lexbor  # noqa: F401
+    except ImportError:
+        logger.warning(f"⚠️ Parser backend '{backend}' is not installed (pip install {backend}); "
+                       f"parsing with the slower {DEFAULT_PARSER} instead")
+        return DEFAULT_PARSER
+    return backend
+
+
+def parse_html(markup, backend=DEFAULT_PARSER):
+    """Parse ``markup`` into a tree exposing the BeautifulSoup find/find_all/get/text subset"""
+    if backend == "selectolax":
+        from selectolax.lexbor import LexborHTMLParser
+        return SelectolaxElement(LexborHTMLParser(markup).root, include_self=True)
+    return BeautifulSoup(markup, backend)
+
+
+def _matches(value, matcher):
+    """Mirror BeautifulSoup's attribute matching rules for a single filter"""
+    if isinstance(value, (list, tuple)):
+        return any(_matches(item, matcher) for item in value) or _matches(" ".join(value), matcher)
+    if matcher is True:
+        return value is not None
+    if isinstance(matcher, Callable):
+        return bool(matcher(value))
+    return value == matcher
+
+
+class SelectolaxElement:
+    """Wrap a selectolax node so the BeautifulSoup-based extraction code runs on it unchanged"""
+    __slots__ = ("node", "include_self")
+
+    def __init__(self, node, include_self=False):
+        self.node = node
+        self.include_self = include_self
+
+    @property
+    def name(self):
+        return self.node.tag
+
+    @property
+    def attrs(self):
+        attributes = dict(self.node.attributes)
+        if attributes.get("class") is not None:
+            attributes["class"] = attributes["class"].split()
+        return attributes
+
+    @property
+    def text(self):
+        return self.node.text(deep=True)
+
+    def get_text(self, separator="", strip=False):
+        return self.node.text(deep=True, separator=separator, strip=strip)
+
+    def get(self, key, default=None):
+        value = self.attrs.get(key)
+        return default if value is None else value
+
+    @property
+    def descendants(self):
+        """Element descendants in document order (text and comment nodes are skipped)"""
+        nodes = self.node.traverse(include_text=False)
+        if not self.include_self:
+            next(nodes, None)
+        for node in nodes:
+            if not node.tag.startswith(("-", "_")):
+                yield SelectolaxElement(node)
+
+    def _iter_matches(self, name, attrs, class_):
+        filters = dict(attrs or {})
+        if class_ is not None:
+            filters["class"] = class_
+        for element in self.descendants:
+            if name is not None and element.name != name:
+                continue
+            if filters:
+                element_attrs = element.attrs
+                if not all(_matches(element_attrs.get(key), matcher) for key, matcher in filters.items()):
+                    continue
+            yield element
+
+    def find(self, name=None, attrs=None, class_=None):
+        return next(self._iter_matches(name, attrs, class_), None)
+
+    def find_all(self, name=None, attrs=None, class_=None):
+        return list(self._iter_matches(name, attrs, class_))
+
+    def __bool__(self):
+        return True
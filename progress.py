@@ -0,0 +1,90 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_FILE_ENV = "SCRAPER_PROGRESS_FILE"
+DEFAULT_EVENT_BUFFER = 200
+
+
+class ProgressReporter:
+    """Appends structured progress events to a JSONL file
+
+    One short line per event (``start``, ``page``, ``finish``) carrying the
+    running totals, so a reader only needs the newest line to show the
+    state of a run.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+
+    @classmethod
+    def from_env(cls):
+        """Reporter for the file named in SCRAPER_PROGRESS_FILE, or None when it is unset"""
+        path = os.environ.get(PROGRESS_FILE_ENV)
+        if not path:
+            return None
+        try:
+            return cls(path)
+        except OSError as e:
+            logger.warning(f"Cannot write progress events to {path}: {e}")
+            return None
+
+    def emit(self, event, **fields):
+        line = json.dumps({"ts": time.time(), "event": event, **fields}, ensure_ascii=False)
+        with self._lock:
+            if self._file is not None:
+                self._file.write(line + "\n")
+                self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class ProgressTail:
+    """Reads the events appended to a progress file since the last ``poll``
+
+    Only complete lines are consumed; the newest ``maxlen`` events stay in
+    a ring buffer and ``latest`` holds the most recent one. With
+    ``parse=None`` lines are kept as text, which tails a log file.
+    """
+    def __init__(self, path, maxlen=DEFAULT_EVENT_BUFFER, parse=json.loads):
+        self.path = path
+        self.parse = parse
+        self.offset = 0
+        self.events = deque(maxlen=maxlen)
+        self.latest = {}
+
+    def poll(self):
+        """Read new events; returns how many arrived"""
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(self.offset)
+                chunk = f.read()
+        except FileNotFoundError:
+            return 0
+        end = chunk.rfind(b"\n")
+        if end == -1:
+            return 0
+        self.offset += end + 1
+        count = 0
+        for line in chunk[:end].splitlines():
+            if self.parse is None:
+                event = line.decode("utf-8", "replace")
+            else:
+                try:
+                    event = self.parse(line)
+                except ValueError:
+                    continue
+            self.events.append(event)
+            self.latest = event
+            count += 1
+        return count
@@ -0,0 +1,153 @@
+import threading
+import time
+import logging
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+# Responses that mean "slow down" rather than "this request is wrong"
+BACKOFF_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+def parse_retry_after(value):
+    """Return the delay in seconds requested by a Retry-After header, or None"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class TokenBucket:
+    """Token bucket whose refill rate adapts with AIMD feedback from responses"""
+    def __init__(self, rate, burst=1, min_rate=0.1, max_rate=20.0,
+                 increase_step=0.1, decrease_factor=0.5):
+        self.rate = float(rate)
+        self.burst = max(1.0, float(burst))
+        self.min_rate = min_rate
+        self.max_rate = max(max_rate, self.rate)  # Never cap below the requested starting rate
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.tokens = self.burst
+        self.blocked_until = 0.0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self):
+        """Reserve one token and sleep until it is due"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= 1.0
+            delay = max(0.0, -self.tokens / self.rate, self.blocked_until - now)
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    def on_success(self):
+        """Additive increase: creep towards whatever rate the host tolerates"""
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase_step)
+
+    def on_backoff(self, retry_after=None):
+        """Multiplicative decrease, plus a hard pause when the server asks for one"""
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+            if retry_after:
+                self.blocked_until = max(self.blocked_until, time.monotonic() + retry_after)
+            return self.rate
+
+
+class HostRateLimiter:
+    """One adaptive token bucket per host, shared by every thread of a scraper"""
+    def __init__(self, initial_rate=1.0, **bucket_options):
+        self.initial_rate = initial_rate
+        self.bucket_options = bucket_options
+        self.buckets = {}
+        self._lock = threading.Lock()
+
+    def set_rate(self, requests_per_second):
+        """Start every host at ``requests_per_second`` and never go above it
+
+        Backoff still lowers the rate and successes ramp it back, but only up
+        to this ceiling, so the figure is a real budget per host.
+        """
+        with self._lock:
+            self.initial_rate = requests_per_second
+            self.bucket_options["max_rate"] = requests_per_second
+            for bucket in self.buckets.values():
+                with bucket._lock:
+                    bucket.max_rate = requests_per_second
+                    bucket.rate = min(bucket.rate, requests_per_second)
+
+    def bucket_for(self, url):
+        host = urlsplit(url).netloc
+        with self._lock:
+            bucket = self.buckets.get(host)
+            if bucket is None:
+                bucket = TokenBucket(self.initial_rate, **self.bucket_options)
+                self.buckets[host] = bucket
+            return bucket
+
+    def acquire(self, url):
+        return self.bucket_for(url).acquire()
+
+    def record(self, url, response):
+        """Feed a response back into the host's bucket; return True if it asked us to back off"""
+        bucket = self.bucket_for(url)
+        if response.status_code in BACKOFF_STATUS_CODES:
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            new_rate = bucket.on_backoff(retry_after)
+            logger.warning(f"Backing off {urlsplit(url).netloc} after HTTP {response.status_code}: "
+                           f"{new_rate:.2f} requests/second"
+                           + (f", paused {retry_after:.0f}s (Retry-After)" if retry_after else ""))
+            return True
+        bucket.on_success()
+        return False
+
+    def current_rates(self):
+        with self._lock:
+            return {host: bucket.rate for host, bucket in self.buckets.items()}
+
+
+class ThrottledSession(requests.Session):
+    """requests.Session that waits for a per-host token before every request
+
+    Responses with 429/5xx shrink the host's rate and are retried up to
+    ``max_retries`` times once the bucket (and any Retry-After pause) allows.
+    ``timeout`` is applied to every request that does not pass its own.
+    """
+    def __init__(self, rate_limiter=None, max_retries=3, timeout=None):
+        super().__init__()
+        self.rate_limiter = rate_limiter or HostRateLimiter()
+        self.max_retries = max_retries
+        self.timeout = timeout
+
+    def request(self, method, url, *args, **kwargs):
+        if self.timeout is not None:
+            kwargs.setdefault("timeout", self.timeout)
+        attempt = 0
+        while True:
+            self.rate_limiter.acquire(url)
+            response = super().request(method, url, *args, **kwargs)
+            backed_off = self.rate_limiter.record(url, response)
+            if not backed_off or attempt >= self.max_retries:
+                return response
+            attempt += 1
+            response.close()
+            logger.info(f"Retrying {url} (attempt {attempt + 1}/{self.max_retries + 1})")
@@ -0,0 +1,181 @@
+import argparse
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from dedup import SeenSet
+from http_cache import HttpCache
+from main import (DEFAULT_CONCURRENCY, DEFAULT_REQUESTS_PER_SECOND, DETAILED_COLUMNS, PREFERRED_COLUMNS,
+                  PropertyScraper, open_run_sink)
+from sinks import open_sink
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = "https://www.propertyfinder.ae/en/search?c=1&t=5&fu=0&ob=mr"
+MERGE_BATCH_SIZE = 500
+
+
+def with_query(base_url, **params):
+    """Return ``base_url`` with the given query parameters set or replaced"""
+    parts = urlsplit(base_url)
+    query = dict(parse_qsl(parts.query, keep_blank_values=True))
+    query.update({key: str(value) for key, value in params.items()})
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def plan_page_shards(base_url, start_page, total_pages, shards):
+    """Split pages ``start_page``..``start_page + total_pages - 1`` into contiguous ranges"""
+    shards = max(1, min(shards, total_pages))
+    size, remainder = divmod(total_pages, shards)
+    plan = []
+    page = start_page
+    for n in range(shards):
+        pages = size + (1 if n < remainder else 0)
+        plan.append({"name": f"pages_{page}-{page + pages - 1}", "base_url": base_url,
+                     "start_page": page, "max_pages": pages})
+        page += pages
+    return plan
+
+
+def plan_query_shards(base_url, param, values, start_page=1, max_pages=None):
+    """One shard per value of a search filter such as ``t`` (property type) or ``c`` (category)"""
+    return [{"name": f"{param}={value}", "base_url": with_query(base_url, **{param: value}),
+             "start_page": start_page, "max_pages": max_pages} for value in values]
+
+
+def run_shard(shard, output_dir, concurrency, requests_per_second, collect_detailed_data):
+    """Crawl one shard in a worker process with its own session and rate budget
+
+    Every shard opens the shared detail-page cache; HttpCache waits on the
+    other workers' writes, so shards reuse each other's detail pages.
+    """
+    safe_name = "".join(ch if ch.isalnum() or ch in "-_=" else "_" for ch in shard["name"])
+    records_file = os.path.join(output_dir, f"shard_{safe_name}.jsonl")
+    sink = open_sink(records_file, PREFERRED_COLUMNS + DETAILED_COLUMNS)
+    scraper = PropertyScraper(sink=sink, keep_records=False, cache=HttpCache())
+    with sink:
+        scraper.scrape_multiple_pages(
+            base_url=shard["base_url"],
+            start_page=shard["start_page"],
+            max_pages=shard["max_pages"],
+            collect_detailed_data=collect_detailed_data,
+            auto_detect_end=True,
+            concurrency=concurrency,
+            requests_per_second=requests_per_second,
+        )
+    scraper.cache.close()
+    return {"name": shard["name"], "records_file": records_file, "record_count": scraper.record_count,
+            "duplicates": scraper.duplicate_count}
+
+
+def merge_shards(shard_results, sink):
+    """Stream shard outputs into ``sink``, keeping the first record per property_id
+
+    Returns ``(merged, duplicates)``; ``global_property_index`` is renumbered
+    so the merged run reads like a single crawl.
+    """
+    seen_listings = SeenSet(exact=True)
+    merged = 0
+    duplicates = 0
+    for result in shard_results:
+        batch = []
+        with open(result["records_file"], encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if not seen_listings.add(record["property_id"]):
+                    duplicates += 1
+                    continue
+                merged += 1
+                record["global_property_index"] = merged
+                batch.append(record)
+                if len(batch) >= MERGE_BATCH_SIZE:
+                    sink.write_batch(batch)
+                    batch = []
+        sink.write_batch(batch)
+    return merged, duplicates
+
+
+def sharded_crawl(shards, workers=None, concurrency=DEFAULT_CONCURRENCY,
+                  requests_per_second=DEFAULT_REQUESTS_PER_SECOND, collect_detailed_data=False, output_dir=None):
+    """Run ``shards`` across worker processes, then merge and export them as one dataset
+
+    Every shard has its own session, rate limiter and JSONL file; the
+    ``requests_per_second`` ceiling applies per shard, so the total request
+    rate stays under ``workers * requests_per_second``.
+    """
+    workers = workers or os.cpu_count() or 1
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    output_dir = output_dir or f"shards_{timestamp}"
+    os.makedirs(output_dir, exist_ok=True)
+    logger.info(f"🧩 Crawling {len(shards)} shards on {workers} worker processes into {output_dir}")
+
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(run_shard, shard, output_dir, concurrency, requests_per_second,
+                                   collect_detailed_data): shard["name"] for shard in shards}
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                results[name] = future.result()
+                logger.info(f"✅ Shard {name}: {results[name]['record_count']} listings")
+            except Exception as e:
+                logger.error(f"❌ Shard {name} failed: {e}")
+
+    # Merge in plan order so earlier pages and filters win ties
+    ordered = [results[shard["name"]] for shard in shards if shard["name"] in results]
+    records_file = f"property_data_{timestamp}.jsonl"
+    sink = open_run_sink(records_file)
+    with sink:
+        merged, duplicates = merge_shards(ordered, sink)
+    logger.info(f"🔗 Merged {merged} listings into {records_file}, dropped {duplicates} duplicates across shards")
+    if not merged:
+        print("❌ No properties scraped")
+        return None
+
+    # Exports read the merged JSONL back through the sink, like any streamed run
+    exporter = PropertyScraper(sink=sink, keep_records=False)
+    excel_file = exporter.save_to_excel()
+    parquet_file = exporter.save_to_parquet()
+    print(f"✅ {merged} unique listings from {len(ordered)}/{len(shards)} shards "
+          f"({duplicates} cross-shard duplicates dropped), saved to {excel_file}")
+    if parquet_file:
+        print(f"📦 Typed columnar copy: {parquet_file}")
+    return records_file
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Crawl Property Finder in parallel shards")
+    parser.add_argument("--base-url", default=DEFAULT_BASE_URL)
+    parser.add_argument("--pages", help="page range to split across shards, e.g. 1-200")
+    parser.add_argument("--shards", type=int, default=os.cpu_count() or 1, help="number of page-range shards")
+    parser.add_argument("--param", help="search filter to shard on, e.g. t or c")
+    parser.add_argument("--values", help="comma-separated values for --param, e.g. 1,5,35")
+    parser.add_argument("--max-pages", type=int, help="page limit per filter shard (default: until the end)")
+    parser.add_argument("--workers", type=int, help="worker processes (default: all cores)")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="pages in flight per shard")
+    parser.add_argument("--rps", type=float, default=DEFAULT_REQUESTS_PER_SECOND, help="request rate ceiling per shard")
+    parser.add_argument("--detailed", action="store_true", help="collect detail pages as well")
+    args = parser.parse_args()
+
+    if args.param:
+        if not args.values:
+            parser.error("--param needs --values")
+        shards = plan_query_shards(args.base_url, args.param, args.values.split(","), max_pages=args.max_pages)
+    elif args.pages:
+        first, _, last = args.pages.partition("-")
+        start_page, end_page = int(first), int(last or first)
+        shards = plan_page_shards(args.base_url, start_page, end_page - start_page + 1, args.shards)
+    else:
+        parser.error("give either --pages or --param/--values")
+
+    sharded_crawl(shards, workers=args.workers, concurrency=args.concurrency, requests_per_second=args.rps,
+                  collect_detailed_data=args.detailed)
+
+
+if __name__ == "__main__":
+    main()
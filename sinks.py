@@ -0,0 +1,177 @@
+import csv
+import json
+import logging
+import os
+import threading
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+class RecordSink:
+    """Append-only destination for scraped records, flushed after every batch
+
+    Batches may arrive from several threads (page merges and detail workers),
+    so writes are serialised with a lock.
+    """
+    extension = None
+
+    def __init__(self, path, append=False):
+        self.path = path
+        self.append = append and os.path.exists(path)
+        self.records_written = 0
+        self._lock = threading.Lock()
+
+    def write_batch(self, records):
+        if not records:
+            return
+        with self._lock:
+            self._write(records)
+            self.records_written += len(records)
+
+    def _write(self, records):
+        raise NotImplementedError
+
+    def mark_seen(self, property_ids):
+        """Note listings that were seen again unchanged; only stores that track history care"""
+
+    def close(self):
+        pass
+
+    def read_frame(self):
+        """Load everything written so far as a DataFrame"""
+        raise NotImplementedError
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class JsonlSink(RecordSink):
+    """One JSON object per line; the most robust format for crash-safe appends"""
+    extension = ".jsonl"
+
+    def __init__(self, path, append=False):
+        super().__init__(path, append)
+        self._file = open(path, "a" if self.append else "w", encoding="utf-8")
+
+    def _write(self, records):
+        for record in records:
+            self._file.write(json.dumps(record, ensure_ascii=False, default=str))
+            self._file.write("\n")
+        self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+    def read_frame(self):
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            return pd.DataFrame()
+        return pd.read_json(self.path, lines=True, dtype=False, convert_dates=False)
+
+
+class CsvSink(RecordSink):
+    """CSV with a fixed column list; fields outside ``columns`` are dropped"""
+    extension = ".csv"
+
+    def __init__(self, path, columns, append=False):
+        super().__init__(path, append)
+        self.columns = list(columns)
+        self._file = open(path, "a" if self.append else "w", encoding="utf-8", newline="")
+        self._writer = csv.DictWriter(self._file, fieldnames=self.columns, extrasaction="ignore")
+        if not self.append:
+            self._writer.writeheader()
+            self._file.flush()
+
+    def _write(self, records):
+        self._writer.writerows(records)
+        self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+    def read_frame(self):
+        return pd.read_csv(self.path, dtype=str, keep_default_na=False)
+
+
+class ParquetSink(RecordSink):
+    """Parquet file with one row group per batch (requires pyarrow)
+
+    Raw scraped values are stored as strings; the footer is written on close,
+    so an interrupted run should use JSONL instead.
+    """
+    extension = ".parquet"
+
+    def __init__(self, path, columns, append=False):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        if append and os.path.exists(path):
+            raise ValueError("Parquet files cannot be appended to; use a JSONL sink to resume runs")
+        super().__init__(path, append=False)
+        self.columns = list(columns)
+        self._pa = pa
+        self._schema = pa.schema([(column, pa.string()) for column in self.columns])
+        self._writer = pq.ParquetWriter(path, self._schema)
+
+    def _write(self, records):
+        arrays = {
+            column: [None if record.get(column) is None else str(record.get(column)) for record in records]
+            for column in self.columns
+        }
+        self._writer.write_table(self._pa.table(arrays, schema=self._schema))
+
+    def close(self):
+        with self._lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+
+    def read_frame(self):
+        return pd.read_parquet(self.path)
+
+
+class MultiSink(RecordSink):
+    """Fan every batch out to several sinks; the first one is the file read back for exports"""
+    def __init__(self, *sinks):
+        super().__init__(sinks[0].path, append=sinks[0].append)
+        self.sinks = sinks
+
+    def _write(self, records):
+        for sink in self.sinks:
+            sink.write_batch(records)
+
+    def mark_seen(self, property_ids):
+        for sink in self.sinks:
+            sink.mark_seen(property_ids)
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
+
+    def read_frame(self):
+        return self.sinks[0].read_frame()
+
+
+SINK_TYPES = {sink.extension: sink for sink in (JsonlSink, CsvSink, ParquetSink)}
+STORE_EXTENSIONS = (".db", ".sqlite")
+
+
+def open_sink(path, columns, append=False):
+    """Pick a sink implementation from the file extension"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension in STORE_EXTENSIONS:
+        from listing_store import ListingStore
+        return ListingStore(path, columns)
+    sink_type = SINK_TYPES.get(extension)
+    if sink_type is None:
+        raise ValueError(f"Unsupported output format {extension!r}; use one of {', '.join((*SINK_TYPES, *STORE_EXTENSIONS))}")
+    if sink_type is JsonlSink:
+        return sink_type(path, append=append)
+    return sink_type(path, columns, append=append)
@@ -0,0 +1,173 @@
+import logging
+from html.parser import HTMLParser
+
+logger = logging.getLogger(__name__)
+
+VOID_ELEMENTS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link",
+    "meta", "param", "source", "track", "wbr",
+}
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+class StreamElement:
+    """Minimal element tree node exposing what CardExtractor and the detail parser read"""
+    __slots__ = ("name", "attrs", "children")
+
+    def __init__(self, name, attrs):
+        self.name = name
+        self.attrs = attrs
+        self.children = []
+
+    @property
+    def descendants(self):
+        for child in self.children:
+            if isinstance(child, StreamElement):
+                yield child
+                yield from child.descendants
+
+    @property
+    def text(self):
+        return "".join(child if isinstance(child, str) else child.text for child in self.children)
+
+    def get(self, key, default=None):
+        value = self.attrs.get(key)
+        return default if value is None else value
+
+
+def _attrs_dict(attrs):
+    attributes = {}
+    for key, value in attrs:
+        if key == "class":
+            attributes[key] = (value or "").split()
+        else:
+            attributes[key] = value if value is not None else ""
+    return attributes
+
+
+class StreamingElementParser(HTMLParser):
+    """Incremental parser that materialises only the subtrees a subclass asks for
+
+    Outside captured elements only a stack of (tag, attrs) is kept, so memory
+    stays proportional to one captured element rather than the whole page.
+    Subclasses implement ``should_capture`` and ``element_complete`` and may
+    override ``start_tag`` to observe every tag.
+    """
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.open_tags = []  # (tag, attrs) of open elements outside any capture
+        self.capture_stack = []  # open StreamElements of the subtree being captured
+
+    def should_capture(self, tag, attrs, parent_tag, parent_attrs):
+        return False
+
+    def element_complete(self, element):
+        pass
+
+    def start_tag(self, tag, attrs):
+        pass
+
+    def handle_starttag(self, tag, attrs):
+        attributes = _attrs_dict(attrs)
+        self.start_tag(tag, attributes)
+        if self.capture_stack:
+            element = StreamElement(tag, attributes)
+            self.capture_stack[-1].children.append(element)
+            if tag not in VOID_ELEMENTS:
+                self.capture_stack.append(element)
+            return
+        parent_tag, parent_attrs = self.open_tags[-1] if self.open_tags else (None, {})
+        if self.should_capture(tag, attributes, parent_tag, parent_attrs):
+            element = StreamElement(tag, attributes)
+            if tag in VOID_ELEMENTS:
+                self.element_complete(element)
+            else:
+                self.capture_stack.append(element)
+            return
+        if tag not in VOID_ELEMENTS:
+            self.open_tags.append((tag, attributes))
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_ELEMENTS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if self.capture_stack:
+            # Close up to the matching open element, tolerating unclosed children
+            for depth in range(len(self.capture_stack) - 1, -1, -1):
+                if self.capture_stack[depth].name == tag:
+                    del self.capture_stack[depth + 1:]
+                    element = self.capture_stack.pop()
+                    if not self.capture_stack:
+                        self.element_complete(element)
+                    return
+            return
+        for depth in range(len(self.open_tags) - 1, -1, -1):
+            if self.open_tags[depth][0] == tag:
+                del self.open_tags[depth:]
+                return
+
+    def handle_data(self, data):
+        if self.capture_stack:
+            self.capture_stack[-1].children.append(data)
+
+    def feed_response(self, response, chunk_size=STREAM_CHUNK_SIZE):
+        """Feed a streamed requests response through the parser chunk by chunk"""
+        if response.encoding is None:
+            response.encoding = "utf-8"
+        for chunk in response.iter_content(chunk_size=chunk_size, decode_unicode=True):
+            self.feed(chunk)
+        self.close()
+
+
+class StreamingCardParser(StreamingElementParser):
+    """Emit each listing card's subtree through ``on_card`` as soon as its closing tag arrives"""
+    def __init__(self, on_card):
+        super().__init__()
+        self.on_card = on_card
+        self.cards_seen = 0
+
+    def should_capture(self, tag, attrs, parent_tag, parent_attrs):
+        if tag != "li":
+            return False
+        if attrs.get("data-id") is not None or attrs.get("data-testid") == "list-item":
+            return True
+        return parent_tag == "ul" and "container" in " ".join(parent_attrs.get("class", [])).lower()
+
+    def element_complete(self, element):
+        self.cards_seen += 1
+        self.on_card(element)
+
+
+class StreamingDetailParser(StreamingElementParser):
+    """Collect detail-page fields and count listing images without keeping the page"""
+    FIELDS = {
+        "detailed_title": ("h1", "styles_desktop_title__j0uNx"),
+        "detailed_location": ("p", "styles-module_map__title__M2mBC"),
+        "description": ("article", "styles_description__tKGaD"),
+        "detailed_price": ("p", "styles_desktop_navigator__price__BYvcC"),
+    }
+
+    def __init__(self):
+        super().__init__()
+        self.values = {}
+        self.image_count = 0
+        self._capturing_field = None
+
+    def start_tag(self, tag, attrs):
+        if tag == "img":
+            src = attrs.get("src")
+            if src and "propertyfinder.ae" in src:
+                self.image_count += 1
+
+    def should_capture(self, tag, attrs, parent_tag, parent_attrs):
+        for field, (field_tag, field_class) in self.FIELDS.items():
+            if field not in self.values and tag == field_tag and field_class in attrs.get("class", []):
+                self._capturing_field = field
+                return True
+        return False
+
+    def element_complete(self, element):
+        self.values[self._capturing_field] = element.text.strip()
+        self._capturing_field = None
@@ -0,0 +1,156 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+
+import numpy as np
+import pandas as pd
+
+from normalize import parse_price
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SUMMARY_PATH = ".summaries.db"
+UNKNOWN = "Unknown"
+# Price bands in AED; the histogram is kept per (location, property_type) so filters still apply
+PRICE_BIN_EDGES = [0, 250_000, 500_000, 1_000_000, 2_000_000, 5_000_000, 10_000_000, 20_000_000, 50_000_000, np.inf]
+PRICE_BIN_LABELS = ["<250K", "250K-500K", "500K-1M", "1M-2M", "2M-5M", "5M-10M", "10M-20M", "20M-50M", "50M+"]
+CUBE_KEYS = ["location", "property_type", "price_bin"]
+
+
+def _text_column(df, name):
+    if name not in df.columns:
+        return pd.Series(UNKNOWN, index=df.index, dtype="string")
+    values = df[name].astype("string")
+    return values.mask(values.isna() | values.isin(["", "N/A"]), UNKNOWN)
+
+
+def summarize(df):
+    """Count and price-sum cube over (location, property_type, price band) for a frame of listings"""
+    if df.empty:
+        return pd.DataFrame(columns=CUBE_KEYS + ["count", "price_sum"])
+    if 'price_aed' in df.columns:
+        prices = pd.to_numeric(df['price_aed'], errors="coerce")
+    elif 'price' in df.columns:
+        prices = parse_price(df['price'].astype("string"))
+    else:
+        prices = pd.Series(np.nan, index=df.index)
+    prices = prices.astype(float)
+    bins = pd.cut(prices, PRICE_BIN_EDGES, labels=PRICE_BIN_LABELS, right=False)
+    frame = pd.DataFrame({
+        "location": _text_column(df, 'location'),
+        "property_type": _text_column(df, 'property_type'),
+        "price_bin": bins.astype("string").fillna(UNKNOWN),
+        "price": prices,
+    })
+    cube = frame.groupby(CUBE_KEYS, observed=True, dropna=False).agg(
+        count=("price", "size"), price_sum=("price", "sum"))
+    return cube.reset_index()
+
+
+class SummaryStore:
+    """Precomputed listing aggregates per data file, kept in a small SQLite file
+
+    A file's cube is rebuilt only when the file changes. JSONL record files
+    that have only grown (a scrape still writing them) are folded in from
+    the last offset, so refreshing a live run costs the new lines rather
+    than the whole file.
+    """
+    def __init__(self, path=DEFAULT_SUMMARY_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS sources ("
+                "path TEXT PRIMARY KEY, mtime_ns INTEGER NOT NULL, size INTEGER NOT NULL, offset INTEGER NOT NULL)")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS cells ("
+                "path TEXT NOT NULL, location TEXT NOT NULL, property_type TEXT NOT NULL, price_bin TEXT NOT NULL, "
+                "count INTEGER NOT NULL, price_sum REAL NOT NULL, "
+                "PRIMARY KEY (path, location, property_type, price_bin))")
+
+    def summary(self, path, load_frame):
+        """The cube for ``path``, refreshed first if the file changed
+
+        ``load_frame(path)`` reads a workbook or Parquet file in full; JSONL
+        files are read line by line here.
+        """
+        stat = os.stat(path)
+        with self._lock:
+            source = self.connection.execute(
+                "SELECT mtime_ns, size, offset FROM sources WHERE path = ?", (path,)).fetchone()
+            if source is None or source[:2] != (stat.st_mtime_ns, stat.st_size):
+                if not path.endswith(".jsonl"):
+                    self._rebuild(path, stat, load_frame(path))
+                elif source is not None and stat.st_size >= source[2]:
+                    self._fold_jsonl(path, stat, source[2])
+                else:
+                    # New or rewritten record file: start over from its first line
+                    with self.connection:
+                        self.connection.execute("DELETE FROM cells WHERE path = ?", (path,))
+                    self._fold_jsonl(path, stat, 0)
+            return pd.read_sql_query(
+                "SELECT location, property_type, price_bin, count, price_sum FROM cells WHERE path = ?",
+                self.connection, params=(path,))
+
+    def _rebuild(self, path, stat, df):
+        with self.connection:
+            self.connection.execute("DELETE FROM cells WHERE path = ?", (path,))
+            self._add_cells(path, summarize(df))
+            self.connection.execute("INSERT OR REPLACE INTO sources VALUES (?, ?, ?, ?)",
+                                    (path, stat.st_mtime_ns, stat.st_size, stat.st_size))
+
+    def _fold_jsonl(self, path, stat, offset):
+        with open(path, "rb") as f:
+            f.seek(offset)
+            chunk = f.read(stat.st_size - offset)
+        end = chunk.rfind(b"\n") + 1  # Leave a half-written last line for the next refresh
+        records = [json.loads(line) for line in chunk[:end].splitlines() if line.strip()]
+        with self.connection:
+            self._add_cells(path, summarize(pd.DataFrame(records)))
+            self.connection.execute("INSERT OR REPLACE INTO sources VALUES (?, ?, ?, ?)",
+                                    (path, stat.st_mtime_ns, stat.st_size, offset + end))
+
+    def _add_cells(self, path, cube):
+        self.connection.executemany(
+            "INSERT INTO cells VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(path, location, property_type, price_bin) "
+            "DO UPDATE SET count = count + excluded.count, price_sum = price_sum + excluded.price_sum",
+            [(path, row.location, row.property_type, row.price_bin, int(row.count), float(row.price_sum))
+             for row in cube.itertuples(index=False)])
+
+    def prune(self, paths):
+        """Forget summaries of files that are no longer listed"""
+        with self._lock, self.connection:
+            stored = [row[0] for row in self.connection.execute("SELECT path FROM sources")]
+            for path in set(stored) - set(paths):
+                self.connection.execute("DELETE FROM cells WHERE path = ?", (path,))
+                self.connection.execute("DELETE FROM sources WHERE path = ?", (path,))
+
+    def close(self):
+        with self._lock:
+            if self.connection is not None:
+                self.connection.close()
+                self.connection = None
+
+
+def filter_cube(cube, locations=(), property_types=()):
+    if locations:
+        cube = cube[cube["location"].isin(locations)]
+    if property_types:
+        cube = cube[cube["property_type"].isin(property_types)]
+    return cube
+
+
+def counts_by(cube, column, limit=None):
+    """Listing counts per value of ``column``, largest first"""
+    counts = cube.groupby(column)["count"].sum().sort_values(ascending=False)
+    return counts.head(limit) if limit else counts
+
+
+def price_histogram(cube):
+    """Listing counts per price band in band order; listings without a price are left out"""
+    counts = cube.groupby("price_bin")["count"].sum()
+    return counts.reindex(PRICE_BIN_LABELS, fill_value=0)
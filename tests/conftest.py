@@ -0,0 +1,16 @@
+import os
+import sys
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The scraper modules live flat in the repository root
+sys.path.insert(0, REPO_ROOT)
+
+
+@pytest.fixture(scope="session")
+def index_html():
+    """The saved Bayut results page kept in the repository root"""
+    with open(os.path.join(REPO_ROOT, "index.html"), encoding="utf-8") as f:
+        return f.read()
@@ -0,0 +1,63 @@
+import http.server
+import threading
+from contextlib import contextmanager
+from urllib.parse import parse_qs, urlsplit
+
+
+def listing_card(page, i, host=""):
+    """One result-page card in the markup the DOM extractor reads"""
+    return (
+        f'<li data-id="{page}-{i}"><p data-testid="property-card-type">Land</p>'
+        f'<p data-testid="property-card-price">1,200,000 AED</p>'
+        f'<h2 class="card_title">Plot {page}-{i}</h2><p class="card_location">Dubai Hills</p>'
+        f'<p data-testid="property-card-spec-area">5,000 sqft</p>'
+        f'<p data-testid="property-card-spec-bedroom">3 Beds</p><p data-testid="property-card-spec-bathroom">2 Baths</p>'
+        f'<a data-testid="property-card-link" href="{host}/en/plp/{page}-{i}.html">x</a>'
+        f'<p class="listing-level_x">Featured</p><p class="publish-info_x">Listed 3 days ago</p>'
+        f'<a data-testid="property-card-contact-action-CALL" href="tel:+97100">c</a>'
+        f'<span class="image-count_x">12</span></li>'
+    )
+
+
+def listing_page(page, cards=3, host=""):
+    items = "".join(listing_card(page, i, host) for i in range(cards))
+    return f'<html><body><ul class="styles_desktop_containerV85pq">{items}</ul></body></html>'
+
+
+def page_number(path):
+    return int(parse_qs(urlsplit(path).query).get("page", ["1"])[0])
+
+
+@contextmanager
+def serve(respond):
+    """Run a local HTTP server; ``respond(path)`` returns ``(status, headers, body)``
+
+    Yields the base URL; every request path is appended to ``server.hits``.
+    """
+    hits = []
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            hits.append(self.path)
+            status, headers, body = respond(self.path)
+            data = body.encode()
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.hits = hits
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server, f"http://127.0.0.1:{server.server_port}"
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,20 @@
+from bayut_main import extract_bayut_cards, visible_card_fields
+from parsing import parse_html
+
+
+def test_json_first_listing_keeps_the_card_fields(index_html):
+    listings = extract_bayut_cards(index_html)
+    assert len(listings) == 1
+    listing = listings[0]
+    assert listing["Price"] == "1,849,999"
+    assert listing["Reference"] is not None
+    assert listing["Location"] == "Natura, DAMAC Hills 2 (Akoya by DAMAC), Dubai"
+    assert listing["Title"] == "| Genuine Resale | 4BR Townhouse | With Payment Plan |"
+    assert listing["Size"] == "1,210" and listing["Unit"] == "SQFT"
+
+
+def test_visible_fields_in_older_card_markup():
+    card = parse_html('<li><span class="f343d9ce">2,500,000</span><div class="_7e396fc3">Jumeirah, Dubai</div>'
+                      '<span class="ref"><span>Ref: 123-ABC</span></span></li>')
+    assert visible_card_fields(card) == {"Price": "2,500,000", "Location": "Jumeirah, Dubai",
+                                         "Reference": "Ref: 123-ABC"}
@@ -0,0 +1,54 @@
+import json
+import time
+
+from checkpoint import ScrapeCheckpoint
+from main import PropertyScraper
+from sinks import open_sink
+from stub_server import listing_page, page_number, serve
+
+LAST_PAGE = 8
+
+
+class StopAfter:
+    """Stop event that trips once the scraper has merged ``records`` listings"""
+    def __init__(self, scraper, records):
+        self.scraper = scraper
+        self.records = records
+
+    def is_set(self):
+        return self.scraper.record_count >= self.records
+
+
+def run(records_file, checkpoint_path, base_url, stop_after=None):
+    sink = open_sink(str(records_file), [], append=True)
+    scraper = PropertyScraper(sink=sink, keep_records=False)
+    checkpoint = ScrapeCheckpoint.load(str(checkpoint_path)) or ScrapeCheckpoint(str(checkpoint_path))
+    with sink:
+        scraper.scrape_multiple_pages(
+            base_url=f"{base_url}/en/search?c=1&t=5", max_pages=LAST_PAGE + 3, collect_detailed_data=True,
+            concurrency=2, requests_per_second=200, detail_workers=2, checkpoint=checkpoint,
+            stop_event=StopAfter(scraper, stop_after) if stop_after else None)
+    return ScrapeCheckpoint.load(str(checkpoint_path))
+
+
+def test_stop_then_resume_writes_each_listing_once(tmp_path):
+    def respond(path):
+        if "/plp/" in path:
+            time.sleep(0.05)  # Keep detail pages queued when the stop arrives
+            return 200, {}, '<html><h1 class="styles_desktop_title__j0uNx">Detail</h1></html>'
+        page = page_number(path)
+        return 200, {}, listing_page(page, cards=5 if page <= LAST_PAGE else 0, host=base_url)
+
+    records_file = tmp_path / "run.jsonl"
+    checkpoint_path = tmp_path / "checkpoint.json"
+    with serve(respond) as (server, base_url):
+        stopped = run(records_file, checkpoint_path, base_url, stop_after=15)
+        assert not stopped.finished
+        assert stopped.pending_details == []
+        resumed = run(records_file, checkpoint_path, base_url)
+    assert resumed.finished
+
+    records = [json.loads(line) for line in records_file.read_text().splitlines()]
+    ids = [record["property_id"] for record in records]
+    assert len(ids) == len(set(ids)) == LAST_PAGE * 5
+    assert sorted(record["global_property_index"] for record in records) == list(range(1, len(records) + 1))
@@ -0,0 +1,15 @@
+from dedup import card_segments
+
+
+def test_card_keeps_its_nested_lists():
+    html = ('<ul><li data-id="1"><ul><li>3 Beds</li></ul><p>Listed 3 days ago</p></li>'
+            '<li data-id="2"><ul><li>2 Baths</li></ul><a href="tel:+97100">call</a></li></ul><footer></footer>')
+    assert card_segments(html) == [
+        ("1", '<li data-id="1"><ul><li>3 Beds</li></ul><p>Listed 3 days ago</p></li>'),
+        ("2", '<li data-id="2"><ul><li>2 Baths</li></ul><a href="tel:+97100">call</a></li>'),
+    ]
+
+
+def test_unclosed_card_ends_at_next_card_or_its_list():
+    html = '<ul><li data-id="1"><p>a</p><li data-id="2"><p>b</p></ul><footer></footer>'
+    assert card_segments(html) == [("1", '<li data-id="1"><p>a</p>'), ("2", '<li data-id="2"><p>b</p>')]
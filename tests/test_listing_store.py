@@ -0,0 +1,42 @@
+import re
+
+from listing_store import ListingStore, load_known_ids
+from main import PropertyScraper
+from stub_server import listing_page, page_number, serve
+
+
+def record(property_id, price="1,000,000 AED"):
+    return {"property_id": property_id, "price": price, "area": "1,000 sqft", "title": f"Listing {property_id}"}
+
+
+def test_synthetic_ids_are_not_stored(tmp_path):
+    path = str(tmp_path / "listings.db")
+    with ListingStore(path, columns=["property_id", "price", "title"]) as store:
+        store.write_batch([record("101"), record("prop_p1_2"), record("N/A")])
+        store.write_batch([record("prop_p1_2", price="2,000,000 AED")])
+        assert store.known_ids() == {"101"}
+        assert list(store.price_history()["property_id"]) == ["101"]
+
+
+def test_placeholder_ids_never_count_as_known(tmp_path):
+    path = str(tmp_path / "listings.db")
+    with ListingStore(path) as store:
+        store.write_batch([record("101")])
+        # Stores written before placeholder ids were filtered may still hold them
+        with store.connection:
+            store.connection.execute("INSERT INTO listings (property_id, first_seen, last_seen) "
+                                     "VALUES ('prop_p1_1', '2025-01-01', '2025-01-01')")
+    assert load_known_ids(path) == {"101"}
+
+    def respond(path):
+        # Cards without a data-id, so every listing gets a placeholder id
+        page = page_number(path)
+        return 200, {}, re.sub(r' data-id="[^"]+"', "", listing_page(page, cards=3 if page <= 4 else 0))
+
+    scraper = PropertyScraper(json_first=False)
+    with serve(respond) as (server, base_url):
+        scraper.scrape_multiple_pages(base_url=f"{base_url}/en/search?c=1&ob=mr", max_pages=10,
+                                      requests_per_second=200, known_ids=load_known_ids(path),
+                                      stop_after_known_pages=1)
+    assert scraper.record_count == 12
+    assert scraper.new_listing_count == 12
@@ -0,0 +1,44 @@
+import pandas as pd
+import pytest
+
+from normalize import parse_area
+
+SQM = 10.7639
+
+
+@pytest.mark.parametrize("text, sqft", [
+    ("5,000 sqft", 5000.0),
+    ("5,000 sq. ft.", 5000.0),
+    ("2 square feet", 2.0),
+    ("1 square foot", 1.0),
+    ("100 sqm", 100 * SQM),
+    ("100 m²", 100 * SQM),
+    ("1 square meter", SQM),
+    ("2 square meters", 2 * SQM),
+    ("2 square metres", 2 * SQM),
+    ("1 sq yd", 9.0),
+    ("2 sq yds", 18.0),
+    ("1 sq yard", 9.0),
+    ("2 sq yards", 18.0),
+    ("2 square yards", 18.0),
+    ("1 acre", 43560.0),
+    ("1.5 acres", 1.5 * 43560.0),
+    ("1 hectare", 107639.0),
+    ("2 Hectares", 2 * 107639.0),
+    ("750", 750.0),
+])
+def test_area_units(text, sqft):
+    assert parse_area(pd.Series([text], dtype="string"))[0] == pytest.approx(sqft)
+
+
+@pytest.mark.parametrize("unit, factor", [
+    ("sqft", 1.0), ("sqm", SQM), ("sq yards", 9.0), ("acre", 43560.0), ("acres", 43560.0),
+    ("hectare", 107639.0), ("hectares", 107639.0),
+])
+def test_area_with_separate_unit_column(unit, factor):
+    areas = parse_area(pd.Series(["2"], dtype="string"), units=pd.Series([unit], dtype="string"))
+    assert areas[0] == pytest.approx(2 * factor)
+
+
+def test_unknown_unit_is_missing():
+    assert pd.isna(parse_area(pd.Series(["3 furlongs"], dtype="string"))[0])
@@ -0,0 +1,123 @@
+import sys
+
+import pytest
+
+from bayut_main import extract_bayut_cards, visible_card_fields
+import main
+from main import PropertyScraper
+from parsing import DEFAULT_PARSER, PARSER_BACKENDS, parse_html, resolve_parser
+from stub_server import listing_card, serve
+
+# Modules behind each optional backend; without them resolve_parser quietly
+# falls back to html.parser, so those backends are skipped instead
+BACKEND_MODULES = {"lxml": "lxml", "selectolax": "selectolax.lexbor"}
+
+# A plain card, one with fallbacks (untitled h2, bare link, no phone) and one
+# with a "new" tag, entities and nested markup, so every rule gets exercised
+CARDS = [
+    listing_card(1, 0),
+    '<li data-id="1-1"><p data-testid="property-card-type">Villa</p>'
+    '<p data-testid="property-card-price">  3,500,000 AED </p><h2>Untitled villa</h2>'
+    '<p class="styles_location_x">Arabian Ranches</p><a href="/en/plp/1-1.html">x</a>'
+    '<p data-testid="property-card-spec-area">4,200 sqft</p></li>',
+    '<li data-id="1-2"><button data-testid="property-card-tag">New</button>'
+    '<p data-testid="property-card-type">Apartment</p><p data-testid="property-card-price">950,000 AED</p>'
+    '<h2 class="card_title">Sea view &amp; <b>balcony</b></h2><p class="card_location">Dubai Marina</p>'
+    '<div><p data-testid="property-card-spec-bedroom">1 Bed</p>'
+    '<p data-testid="property-card-spec-bathroom">2 Baths</p></div>'
+    '<a data-testid="property-card-link" href="/en/plp/1-2.html">x</a>'
+    '<p class="publish-info_x">Listed 1 hour ago</p><span class="image-count_x">7</span></li>',
+]
+LISTING_PAGE = f'<html><body><ul class="styles_desktop_containerV85pq">{"".join(CARDS)}</ul></body></html>'
+DETAIL_PAGE = (
+    '<html><body><h1 class="styles_desktop_title__j0uNx"> Plot in Dubai Hills </h1>'
+    '<p class="styles-module_map__title__M2mBC">Dubai Hills Estate, Dubai</p>'
+    '<p class="styles_desktop_navigator__price__BYvcC">1,200,000 AED</p>'
+    '<article class="styles_description__tKGaD"><p>Corner plot</p><p>Freehold &amp; ready</p></article>'
+    '<img src="https://static.propertyfinder.ae/1.jpg"><img src="https://cdn.example.com/2.jpg">'
+    '<img src="https://static.propertyfinder.ae/3.jpg"></body></html>'
+)
+BACKENDS = [(parser, False) for parser in PARSER_BACKENDS] + [("html.parser", True)]
+BACKEND_IDS = [*PARSER_BACKENDS, "streaming"]
+
+
+def respond(path):
+    return 200, {}, DETAIL_PAGE if "/plp/" in path else LISTING_PAGE
+
+
+def require(parser):
+    if parser in BACKEND_MODULES:
+        pytest.importorskip(BACKEND_MODULES[parser])
+
+
+def scrape(parser, streaming):
+    scraper = PropertyScraper(parser=parser, json_first=False, streaming=streaming)
+    scraper.rate_limiter.set_rate(100)
+    with serve(respond) as (server, base_url):
+        records = scraper.fetch_page(f"{base_url}/en/search?c=1&page=1", 1)
+        details = scraper.collect_property_data(f"{base_url}/en/plp/1-0.html")
+    for record in records:
+        record.pop("scrape_date")
+    return records, details
+
+
+@pytest.fixture(scope="module")
+def reference():
+    return scrape("html.parser", False)
+
+
+@pytest.mark.parametrize("parser, streaming", BACKENDS, ids=BACKEND_IDS)
+def test_backends_extract_the_same_records(reference, parser, streaming):
+    require(parser)
+    records, details = scrape(parser, streaming)
+    assert len(records) == len(CARDS)
+    assert records == reference[0]
+    assert details == reference[1]
+
+
+def test_reference_records(reference):
+    records, details = reference
+    assert [record["property_id"] for record in records] == ["1-0", "1-1", "1-2"]
+    assert records[1]["title"] == "Untitled villa"
+    assert records[2]["is_new"] == "New"
+    assert details["detailed_image_count"] == 2
+
+
+def index_cards(index_html, parser):
+    """Visible fields and JSON-LD of every listing card in index.html"""
+    soup = parse_html(index_html, parser)
+    return [(visible_card_fields(card), card.find("script", attrs={"type": "application/ld+json"}).get_text())
+            for card in soup.find_all("li", attrs={"aria-label": "Listing"})]
+
+
+@pytest.mark.parametrize("parser", PARSER_BACKENDS)
+def test_backends_parse_index_html_alike(index_html, parser):
+    require(parser)
+    assert resolve_parser(parser) == parser
+    reference = index_cards(index_html, DEFAULT_PARSER)
+    assert reference and reference[0][0]["Price"] == "1,849,999"
+    assert index_cards(index_html, parser) == reference
+    assert extract_bayut_cards(index_html, parser) == extract_bayut_cards(index_html, DEFAULT_PARSER)
+
+
+def test_missing_backend_falls_back_with_a_warning(monkeypatch, caplog):
+    monkeypatch.setitem(sys.modules, "lxml", None)  # Makes "import lxml" raise ImportError
+    assert resolve_parser("lxml") == DEFAULT_PARSER
+    assert "pip install lxml" in caplog.text
+
+
+def test_cli_parser_and_streaming_options_reach_the_scraper(tmp_path, monkeypatch):
+    scrapers = []
+
+    class RecordingScraper(PropertyScraper):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            scrapers.append(self)
+
+    monkeypatch.chdir(tmp_path)  # The job's cache, store and exports land here
+    monkeypatch.setattr(main, "PropertyScraper", RecordingScraper)
+    with serve(respond) as (server, base_url):
+        assert main.cli(["--base-url", f"{base_url}/en/search?c=1", "--max-pages", "1", "--no-auto-detect",
+                         "--rps", "100", "--streaming", "--parser", "html.parser"]) == 0
+    assert (scrapers[0].parser, scrapers[0].streaming) == ("html.parser", True)
+    assert scrapers[0].record_count == len(CARDS)
@@ -0,0 +1,89 @@
+import time
+from email.utils import formatdate
+
+import pytest
+
+from rate_limiter import HostRateLimiter, ThrottledSession, TokenBucket, parse_retry_after
+from stub_server import serve
+
+
+def responses(*statuses, retry_after=None):
+    """Stub that answers with ``statuses`` in turn, then 200 for good"""
+    pending = list(statuses)
+
+    def respond(path):
+        status = pending.pop(0) if pending else 200
+        headers = {"Retry-After": retry_after} if status == 429 and retry_after else {}
+        return status, headers, "ok"
+    return respond
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("2") == 2.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    assert 8 <= parse_retry_after(formatdate(time.time() + 10, usegmt=True)) <= 10
+
+
+def test_token_bucket_paces_requests():
+    bucket = TokenBucket(rate=20)
+    started = time.monotonic()
+    for _ in range(6):
+        bucket.acquire()
+    assert time.monotonic() - started >= 0.2  # 5 waits of 1/20 s after the initial burst token
+
+
+def test_retry_after_pauses_then_retries():
+    limiter = HostRateLimiter(initial_rate=10)
+    session = ThrottledSession(limiter)
+    with serve(responses(429, retry_after="1")) as (server, base_url):
+        started = time.monotonic()
+        response = session.get(f"{base_url}/page")
+        elapsed = time.monotonic() - started
+    assert response.status_code == 200
+    assert len(server.hits) == 2
+    assert elapsed >= 0.9
+    # Halved by the 429, then one additive step for the successful retry
+    assert list(limiter.current_rates().values()) == [pytest.approx(5.1)]
+
+
+def test_rate_backs_off_on_server_errors_and_recovers():
+    limiter = HostRateLimiter(initial_rate=8, increase_step=1.0)
+    session = ThrottledSession(limiter, max_retries=0)
+    with serve(responses(503, 503)) as (server, base_url):
+        url = f"{base_url}/page"
+        assert session.get(url).status_code == 503
+        assert session.get(url).status_code == 503
+        assert limiter.current_rates() == {f"127.0.0.1:{server.server_port}": 2.0}
+        for _ in range(3):
+            assert session.get(url).status_code == 200
+    assert list(limiter.current_rates().values()) == [5.0]
+
+
+def test_gives_up_after_max_retries():
+    session = ThrottledSession(HostRateLimiter(initial_rate=50), max_retries=2)
+    with serve(responses(500, 500, 500, 500)) as (server, base_url):
+        response = session.get(f"{base_url}/page")
+    assert response.status_code == 500
+    assert len(server.hits) == 3
+
+
+def test_session_never_exceeds_the_configured_rate():
+    limiter = HostRateLimiter(increase_step=1.0)
+    limiter.set_rate(5)
+    session = ThrottledSession(limiter)
+    with serve(responses()) as (server, base_url):
+        started = time.monotonic()
+        for _ in range(11):
+            assert session.get(f"{base_url}/page").status_code == 200
+        elapsed = time.monotonic() - started
+    # 10 intervals at 5 requests/second; without a ceiling AIMD would climb towards 20
+    assert 10 / elapsed <= 5 * 1.05
+    assert list(limiter.current_rates().values()) == [5]
+
+
+def test_lowering_the_rate_caps_existing_hosts():
+    limiter = HostRateLimiter(initial_rate=10)
+    limiter.bucket_for("http://example.com/")
+    limiter.set_rate(2)
+    assert limiter.current_rates() == {"example.com": 2}
@@ -0,0 +1,124 @@
+import json
+import time
+
+import pytest
+
+from main import PropertyScraper
+from sinks import open_sink
+from stub_server import listing_page, page_number, serve
+from work_queue import DONE, FAILED, LEASED, PAGE_TASK, QUEUED, InMemoryWorkQueue, WorkQueue, run_worker, seed_pages
+
+LAST_PAGE = 5
+
+
+@pytest.fixture(params=["sqlite", "memory"])
+def make_queue(request, tmp_path):
+    queues = []
+
+    def make(**options):
+        if request.param == "sqlite":
+            queue = WorkQueue(str(tmp_path / "q.db"), **options)
+        else:
+            queue = InMemoryWorkQueue(**options)
+        queues.append(queue)
+        return queue
+
+    yield make
+    for queue in queues:
+        queue.close()
+
+
+def crawl(tmp_path, make_queue, respond, max_attempts=3):
+    queue = make_queue(max_attempts=max_attempts)
+    records_file = tmp_path / "node.jsonl"
+    sink = open_sink(str(records_file), [])
+    scraper = PropertyScraper(sink=sink, keep_records=False)
+    scraper.rate_limiter.set_rate(100)
+    scraper.session.max_retries = 0  # Let the queue, not the session, retry failed pages
+    with serve(respond) as (server, base_url):
+        seed_pages(queue, f"{base_url}/en/search?c=1&t=5", window=4)
+        with sink:
+            run_worker(queue, scraper, threads=2, idle_timeout=5, poll_interval=0.05)
+    records = [json.loads(line) for line in records_file.read_text().splitlines()]
+    return queue, {record["page_number"] for record in records}
+
+
+def test_failed_page_is_retried_and_its_chain_continues(tmp_path, make_queue):
+    failures = {3: 2}
+
+    def respond(path):
+        page = page_number(path)
+        if failures.get(page):
+            failures[page] -= 1
+            return 500, {}, "error"
+        return 200, {}, listing_page(page, cards=3 if page <= LAST_PAGE else 0)
+
+    queue, pages = crawl(tmp_path, make_queue, respond)
+    assert pages == set(range(1, LAST_PAGE + 1))
+    assert FAILED not in queue.counts()
+
+
+def test_page_that_keeps_failing_is_marked_failed(tmp_path, make_queue):
+    def respond(path):
+        page = page_number(path)
+        if page == 3:
+            return 500, {}, "error"
+        return 200, {}, listing_page(page, cards=3 if page <= LAST_PAGE else 0)
+
+    queue, pages = crawl(tmp_path, make_queue, respond, max_attempts=2)
+    assert pages == {1, 2, 4, 5}
+    counts = queue.counts()
+    assert counts[FAILED] == 1
+    assert counts[DONE] == sum(counts.values()) - 1
+
+
+def test_enqueue_skips_known_keys(make_queue):
+    queue = make_queue()
+    assert queue.enqueue(PAGE_TASK, [("a", {"page": 1}), ("b", {"page": 2})]) == 2
+    assert queue.enqueue(PAGE_TASK, [("a", {"page": 1}), ("c", {"page": 3})]) == 1
+    assert queue.counts() == {QUEUED: 3}
+
+
+def test_leased_task_is_not_handed_out_twice(make_queue):
+    queue = make_queue()
+    queue.enqueue(PAGE_TASK, [("a", {"page": 1})])
+    task = queue.lease("node-1")
+    assert (task.key, task.payload, task.attempts) == ("a", {"page": 1}, 1)
+    assert queue.lease("node-2") is None
+    queue.complete(task)
+    assert queue.counts() == {DONE: 1}
+
+
+def test_expired_lease_is_retaken_until_attempts_run_out(make_queue):
+    queue = make_queue(lease_seconds=0.05, max_attempts=2)
+    queue.enqueue(PAGE_TASK, [("a", {"page": 1})])
+    assert queue.lease("node-1").attempts == 1
+    time.sleep(0.1)  # node-1 died holding the lease
+    assert queue.lease("node-2").attempts == 2
+    assert queue.counts() == {LEASED: 1}
+    time.sleep(0.1)
+    assert queue.lease("node-3") is None
+    assert queue.counts() == {FAILED: 1}
+
+
+def test_fail_requeues_until_max_attempts(make_queue):
+    queue = make_queue(max_attempts=2)
+    queue.enqueue(PAGE_TASK, [("a", {"page": 1})])
+    assert queue.fail(queue.lease("node-1"), "HTTP 500") is True
+    assert queue.counts() == {QUEUED: 1}
+    assert queue.fail(queue.lease("node-1"), "HTTP 500") is False
+    assert queue.counts() == {FAILED: 1}
+    assert queue.lease("node-1") is None
+
+
+def test_sqlite_queue_is_shared_between_connections(tmp_path):
+    first = WorkQueue(str(tmp_path / "q.db"))
+    second = WorkQueue(str(tmp_path / "q.db"))
+    try:
+        first.enqueue(PAGE_TASK, [("a", {"page": 1}), ("b", {"page": 2})])
+        leased = {first.lease("node-1").key, second.lease("node-2").key}
+        assert leased == {"a", "b"}
+        assert first.lease("node-1") is None and second.lease("node-2") is None
+    finally:
+        first.close()
+        second.close()
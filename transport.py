@@ -0,0 +1,106 @@
+import logging
+
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from http_cache import CachingSession
+from rate_limiter import HostRateLimiter, ThrottledSession
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+
+class TransportConfig:
+    """Connection pool, timeout and retry settings for a scraper session"""
+    def __init__(self, pool_connections=10, pool_maxsize=10, connect_timeout=10.0, read_timeout=30.0,
+                 retries=3, backoff_factor=0.5, backoff_jitter=0.5, backoff_max=30.0):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.backoff_jitter = backoff_jitter
+        self.backoff_max = backoff_max
+
+    @property
+    def timeout(self):
+        return (self.connect_timeout, self.read_timeout)
+
+    def build_retry(self):
+        """Retry connection-level failures only; 429/5xx pacing belongs to the rate limiter"""
+        options = dict(
+            total=self.retries,
+            connect=self.retries,
+            read=self.retries,
+            status=0,
+            backoff_factor=self.backoff_factor,
+            raise_on_status=False,
+        )
+        try:
+            return Retry(backoff_jitter=self.backoff_jitter, backoff_max=self.backoff_max, **options)
+        except TypeError:
+            # urllib3 < 2 has neither jitter nor a configurable backoff cap
+            return Retry(**options)
+
+
+def mount_adapters(session, config):
+    """(Re)mount pooled, retrying adapters for http and https on ``session``"""
+    for prefix in ("https://", "http://"):
+        old_adapter = session.adapters.get(prefix)
+        session.mount(prefix, HTTPAdapter(
+            pool_connections=config.pool_connections,
+            pool_maxsize=config.pool_maxsize,
+            max_retries=config.build_retry(),
+        ))
+        if old_adapter is not None:
+            old_adapter.close()
+
+
+def build_session(config=None, rate_limiter=None, user_agent=DEFAULT_USER_AGENT, cache=None, cache_filter=None):
+    """Create a throttled session with a sized connection pool, timeouts and retries
+    
+    With an HttpCache, GETs accepted by ``cache_filter`` are served from and
+    revalidated against the on-disk cache.
+    """
+    config = config or TransportConfig()
+    if cache is not None:
+        session = CachingSession(cache, cache_filter, rate_limiter or HostRateLimiter(), timeout=config.timeout)
+    else:
+        session = ThrottledSession(rate_limiter or HostRateLimiter(), timeout=config.timeout)
+    session.headers.update({'User-Agent': user_agent})
+    mount_adapters(session, config)
+    return session
+
+
+def resize_pool(session, config, workers):
+    """Grow the per-host pool so every worker thread can hold its own keep-alive connection"""
+    if workers <= config.pool_maxsize:
+        return
+    logger.info(f"Resizing connection pool from {config.pool_maxsize} to {workers} connections per host")
+    config.pool_maxsize = workers
+    mount_adapters(session, config)
+
+
+def connection_stats(session):
+    """Summarise keep-alive reuse across the session's connection pools"""
+    connections = 0
+    requests_sent = 0
+    for adapter in set(session.adapters.values()):
+        pools = getattr(getattr(adapter, "poolmanager", None), "pools", None)
+        if pools is None:
+            continue
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            connections += pool.num_connections
+            requests_sent += pool.num_requests
+    reused = max(0, requests_sent - connections)
+    return {
+        "requests": requests_sent,
+        "connections_opened": connections,
+        "connections_reused": reused,
+        "reuse_ratio": reused / requests_sent if requests_sent else 0.0,
+    }
@@ -0,0 +1,332 @@
+import argparse
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+
+from transport import resize_pool
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUEUE_PATH = "crawl_queue.db"
+DEFAULT_LEASE_SECONDS = 120
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_PAGE_WINDOW = 8  # Result pages kept queued ahead of the crawl frontier
+PAGE_TASK = "page"
+DETAIL_TASK = "detail"
+QUEUED, LEASED, DONE, FAILED = "queued", "leased", "done", "failed"
+
+
+class Task:
+    """A leased unit of work; ``attempts`` counts this lease"""
+    def __init__(self, task_id, kind, key, payload, attempts):
+        self.id = task_id
+        self.kind = kind
+        self.key = key
+        self.payload = payload
+        self.attempts = attempts
+
+
+class WorkQueue:
+    """Crawl queue in a SQLite file shared by every scraper node
+
+    Tasks are unique by ``key`` (the page or detail URL), so enqueueing a
+    page twice is a no-op and no two nodes ever crawl the same page. A
+    worker leases a task for ``lease_seconds``; a lease that runs out (the
+    node died) puts the task back up for grabs, and after ``max_attempts``
+    leases it is marked failed. Leasing runs in an IMMEDIATE transaction so
+    concurrent workers never get the same task.
+
+    The file uses a rollback journal rather than WAL, whose shared-memory
+    index only works between processes on one host. Nodes on other hosts
+    can share the file only over a filesystem with reliable POSIX byte-range
+    locks (e.g. NFSv4 with locking enabled); SMB shares and NFS mounted with
+    ``nolock`` corrupt it. Every lease takes the whole-file write lock, so
+    this suits a handful of nodes, not a large fleet.
+    """
+    def __init__(self, path=DEFAULT_QUEUE_PATH, lease_seconds=DEFAULT_LEASE_SECONDS,
+                 max_attempts=DEFAULT_MAX_ATTEMPTS):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False, timeout=30, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=DELETE")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS tasks ("
+            "id INTEGER PRIMARY KEY, kind TEXT NOT NULL, key TEXT NOT NULL UNIQUE, payload TEXT NOT NULL, "
+            "state TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0, lease_owner TEXT, lease_expires REAL, "
+            "last_error TEXT, updated_at REAL NOT NULL)")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS tasks_state ON tasks (state, kind, id)")
+
+    def enqueue(self, kind, items):
+        """Add ``(key, payload)`` pairs of one kind; returns how many were new"""
+        rows = [(kind, key, json.dumps(payload), QUEUED, time.time()) for key, payload in items]
+        with self._lock:
+            before = self.connection.total_changes
+            self.connection.execute("BEGIN")
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO tasks (kind, key, payload, state, updated_at) VALUES (?, ?, ?, ?, ?)", rows)
+            self.connection.execute("COMMIT")
+            return self.connection.total_changes - before
+
+    def lease(self, worker_id):
+        """Claim the next task for ``worker_id``, detail pages first; None when nothing is ready"""
+        now = time.time()
+        with self._lock:
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                self.connection.execute(
+                    "UPDATE tasks SET state = ?, last_error = 'lease expired', updated_at = ? "
+                    "WHERE state = ? AND lease_expires < ? AND attempts >= ?",
+                    (FAILED, now, LEASED, now, self.max_attempts))
+                row = self.connection.execute(
+                    "SELECT id, kind, key, payload, attempts FROM tasks "
+                    "WHERE state = ? OR (state = ? AND lease_expires < ?) "
+                    "ORDER BY kind = ? DESC, id LIMIT 1", (QUEUED, LEASED, now, DETAIL_TASK)).fetchone()
+                if row is not None:
+                    self.connection.execute(
+                        "UPDATE tasks SET state = ?, attempts = attempts + 1, lease_owner = ?, lease_expires = ?, "
+                        "updated_at = ? WHERE id = ?", (LEASED, worker_id, now + self.lease_seconds, now, row[0]))
+                self.connection.execute("COMMIT")
+            except Exception:
+                self.connection.execute("ROLLBACK")
+                raise
+        if row is None:
+            return None
+        task_id, kind, key, payload, attempts = row
+        return Task(task_id, kind, key, json.loads(payload), attempts + 1)
+
+    def complete(self, task):
+        with self._lock:
+            self.connection.execute("UPDATE tasks SET state = ?, lease_expires = NULL, updated_at = ? WHERE id = ?",
+                                    (DONE, time.time(), task.id))
+
+    def fail(self, task, error):
+        """Release a task after an error; returns True when it will be retried"""
+        retry = task.attempts < self.max_attempts
+        with self._lock:
+            self.connection.execute(
+                "UPDATE tasks SET state = ?, lease_expires = NULL, last_error = ?, updated_at = ? WHERE id = ?",
+                (QUEUED if retry else FAILED, str(error), time.time(), task.id))
+        return retry
+
+    def counts(self):
+        """Number of tasks per state, e.g. ``{"queued": 3, "done": 40}``"""
+        with self._lock:
+            return dict(self.connection.execute("SELECT state, COUNT(*) FROM tasks GROUP BY state").fetchall())
+
+    def close(self):
+        with self._lock:
+            if self.connection is not None:
+                self.connection.close()
+                self.connection = None
+
+
+class InMemoryWorkQueue:
+    """Same interface as WorkQueue kept in process memory
+
+    A stand-in for single-host runs and for exercising workers without a
+    shared store; all workers must live in the same process.
+    """
+    def __init__(self, lease_seconds=DEFAULT_LEASE_SECONDS, max_attempts=DEFAULT_MAX_ATTEMPTS):
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._tasks = {}  # id -> task state dict
+        self._keys = set()
+
+    def enqueue(self, kind, items):
+        added = 0
+        with self._lock:
+            for key, payload in items:
+                if key in self._keys:
+                    continue
+                self._keys.add(key)
+                task_id = len(self._tasks) + 1
+                self._tasks[task_id] = {"id": task_id, "kind": kind, "key": key, "payload": json.dumps(payload),
+                                        "state": QUEUED, "attempts": 0, "lease_owner": None,
+                                        "lease_expires": None, "last_error": None}
+                added += 1
+        return added
+
+    def lease(self, worker_id):
+        now = time.time()
+        with self._lock:
+            ready = []
+            for task in self._tasks.values():
+                expired = task["state"] == LEASED and task["lease_expires"] < now
+                if expired and task["attempts"] >= self.max_attempts:
+                    task.update(state=FAILED, last_error="lease expired")
+                elif task["state"] == QUEUED or expired:
+                    ready.append(task)
+            if not ready:
+                return None
+            task = min(ready, key=lambda t: (t["kind"] != DETAIL_TASK, t["id"]))
+            task.update(state=LEASED, attempts=task["attempts"] + 1, lease_owner=worker_id,
+                        lease_expires=now + self.lease_seconds)
+            return Task(task["id"], task["kind"], task["key"], json.loads(task["payload"]), task["attempts"])
+
+    def complete(self, task):
+        with self._lock:
+            self._tasks[task.id].update(state=DONE, lease_expires=None)
+
+    def fail(self, task, error):
+        retry = task.attempts < self.max_attempts
+        with self._lock:
+            self._tasks[task.id].update(state=QUEUED if retry else FAILED, lease_expires=None, last_error=str(error))
+        return retry
+
+    def counts(self):
+        with self._lock:
+            counts = {}
+            for task in self._tasks.values():
+                counts[task["state"]] = counts.get(task["state"], 0) + 1
+            return counts
+
+    def close(self):
+        pass
+
+
+def page_url(base_url, page_number):
+    return f"{base_url}&page={page_number}"
+
+
+def seed_pages(queue, base_url, start_page=1, end_page=None, window=DEFAULT_PAGE_WINDOW):
+    """Queue a fixed page range, or the first ``window`` pages of an open-ended crawl
+
+    Open-ended crawls grow as they go: a worker that finds listings on page
+    ``n`` queues page ``n + window``, so the frontier stays ``window`` pages
+    ahead and stops advancing at the first empty page of each chain.
+    """
+    last_page = end_page if end_page is not None else start_page + window - 1
+    extend = end_page is None
+    return queue.enqueue(PAGE_TASK, [
+        (page_url(base_url, page), {"base_url": base_url, "page": page, "window": window, "extend": extend})
+        for page in range(start_page, last_page + 1)])
+
+
+def process_task(queue, scraper, task, collect_detailed_data=False):
+    """Run one leased task against ``scraper`` and write what it produced to its sink"""
+    if task.kind == DETAIL_TASK:
+        property_info = task.payload
+        detailed_data = scraper.collect_property_data(task.key)
+        if not detailed_data and task.attempts < queue.max_attempts:
+            raise RuntimeError(f"no detail data from {task.key}")
+        property_info.update(detailed_data)
+        scraper.add_page_properties([property_info])
+        return
+
+    page = task.payload["page"]
+    # Fetch errors propagate so the task is retried; only a page that loads empty ends its chain
+    page_properties = scraper.fetch_page(task.key, page)
+    unchanged_ids = scraper.unchanged_by_page.pop(page, [])
+    if not page_properties and not unchanged_ids:
+        logger.info(f"Page {page} has no listings, not extending the frontier past it")
+        return
+    if task.payload.get("extend"):
+        next_page = page + task.payload["window"]
+        queue.enqueue(PAGE_TASK, [(page_url(task.payload["base_url"], next_page),
+                                   dict(task.payload, page=next_page))])
+    if not collect_detailed_data:
+        scraper.add_page_properties(page_properties)
+        return
+
+    # Detail pages become their own tasks so any node can enrich them
+    with_details = [p for p in page_properties if p["property_url"] != "N/A"]
+    scraper.add_page_properties([p for p in page_properties if p["property_url"] == "N/A"])
+    queue.enqueue(DETAIL_TASK, [(p["property_url"], p) for p in with_details])
+
+
+def run_worker(queue, scraper, worker_id=None, threads=4, collect_detailed_data=False,
+               idle_timeout=30.0, poll_interval=1.0):
+    """Pull tasks from ``queue`` on ``threads`` threads until it is drained
+
+    A thread also gives up after ``idle_timeout`` seconds without work, e.g.
+    while the only remaining tasks are leased by a node that went away.
+
+    Start this on as many nodes as you like against the same queue; each
+    node writes its own records through ``scraper.sink``.
+    """
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    resize_pool(scraper.session, scraper.transport, threads)
+    completed = [0]
+
+    def work(thread_number):
+        name = f"{worker_id}/{thread_number}"
+        idle_since = None
+        while True:
+            task = queue.lease(name)
+            if task is None:
+                counts = queue.counts()
+                if not counts.get(QUEUED) and not counts.get(LEASED):
+                    return  # Drained: nothing left that could queue more pages
+                idle_since = idle_since or time.monotonic()
+                if time.monotonic() - idle_since >= idle_timeout:
+                    return
+                time.sleep(poll_interval)
+                continue
+            idle_since = None
+            try:
+                process_task(queue, scraper, task, collect_detailed_data)
+                queue.complete(task)
+                completed[0] += 1
+            except Exception as e:
+                retry = queue.fail(task, e)
+                logger.error(f"Task {task.key} failed on attempt {task.attempts}: {e}"
+                             f"{' (will retry)' if retry else ''}")
+
+    workers = [threading.Thread(target=work, args=(n,), daemon=True) for n in range(max(1, threads))]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    logger.info(f"🏁 Worker {worker_id} finished {completed[0]} tasks, queue now {queue.counts()}")
+    return completed[0]
+
+
+def main():
+    from main import DEFAULT_REQUESTS_PER_SECOND, PropertyScraper, open_run_sink
+    from http_cache import HttpCache
+
+    parser = argparse.ArgumentParser(description="Shared crawl queue for several scraper nodes")
+    parser.add_argument("--queue", default=DEFAULT_QUEUE_PATH, help="SQLite queue file; local disk or a network filesystem with POSIX locks")
+    commands = parser.add_subparsers(dest="command", required=True)
+    seed = commands.add_parser("seed", help="queue result pages")
+    seed.add_argument("--base-url", default="https://www.propertyfinder.ae/en/search?c=1&t=5&fu=0&ob=mr")
+    seed.add_argument("--pages", help="fixed page range, e.g. 1-200 (default: open-ended)")
+    seed.add_argument("--window", type=int, default=DEFAULT_PAGE_WINDOW)
+    work = commands.add_parser("work", help="pull and scrape tasks until the queue is drained")
+    work.add_argument("--output", required=True, help="this node's JSONL records file")
+    work.add_argument("--threads", type=int, default=4)
+    work.add_argument("--rps", type=float, default=DEFAULT_REQUESTS_PER_SECOND, help="request rate ceiling for this node")
+    work.add_argument("--detailed", action="store_true")
+    work.add_argument("--idle-timeout", type=float, default=30.0)
+    commands.add_parser("status", help="show task counts")
+    args = parser.parse_args()
+
+    queue = WorkQueue(args.queue)
+    if args.command == "seed":
+        if args.pages:
+            first, _, last = args.pages.partition("-")
+            added = seed_pages(queue, args.base_url, int(first), int(last or first))
+        else:
+            added = seed_pages(queue, args.base_url, window=args.window)
+        print(f"✅ Queued {added} pages in {args.queue}")
+    elif args.command == "work":
+        sink = open_run_sink(args.output, append=True)
+        scraper = PropertyScraper(sink=sink, keep_records=False, cache=HttpCache())
+        scraper.rate_limiter.set_rate(args.rps)
+        with sink:
+            run_worker(queue, scraper, threads=args.threads, collect_detailed_data=args.detailed,
+                       idle_timeout=args.idle_timeout)
+        print(f"✅ This node wrote {scraper.record_count} listings to {args.output}")
+    print(f"📊 Queue: {queue.counts()}")
+    queue.close()
+
+
+if __name__ == "__main__":
+    main()